@@ -8,12 +8,47 @@ import argparse
 import sys
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from workflows.orchestrator import ProFlowOrchestrator
-from data import read_emails_from_csv, read_calendar_from_json
+if TYPE_CHECKING:
+    from workflows.orchestrator import ProFlowOrchestrator
+
+
+def add_briefing_parser(subparsers):
+    """Add the briefing command to the CLI."""
+    briefing_parser = subparsers.add_parser('briefing', help='Generate daily briefing')
+    briefing_parser.add_argument(
+        '--emails',
+        type=str,
+        default=None,
+        help='Path to email CSV file (default: data/sample_emails.csv)'
+    )
+    briefing_parser.add_argument(
+        '--calendar',
+        type=str,
+        default=None,
+        help='Path to calendar JSON file (default: data/calendar.json)'
+    )
+
+
+def add_schedule_parser(subparsers):
+    """Add the schedule command to the CLI."""
+    schedule_parser = subparsers.add_parser('schedule', help='Schedule a meeting')
+    schedule_parser.add_argument('--subject', type=str, required=True, help='Meeting subject')
+    schedule_parser.add_argument('--participants', type=str, required=True, help='Comma-separated list of participants')
+    schedule_parser.add_argument('--duration', type=int, default=60, help='Duration in minutes (default: 60)')
+    schedule_parser.add_argument('--date', type=str, default='tomorrow', help='Preferred date (default: tomorrow)')
+    schedule_parser.add_argument('--location', type=str, default='TBD', help='Meeting location (default: TBD)')
+
+
+# Command name -> function that adds its subparser
+SUBCOMMAND_PARSERS = {
+    'briefing': add_briefing_parser,
+    'schedule': add_schedule_parser,
+}
 
 
 def main():
@@ -36,28 +71,14 @@ Examples:
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
-    # Briefing command
-    briefing_parser = subparsers.add_parser('briefing', help='Generate daily briefing')
-    briefing_parser.add_argument(
-        '--emails',
-        type=str,
-        default=None,
-        help='Path to email CSV file (default: data/sample_emails.csv)'
-    )
-    briefing_parser.add_argument(
-        '--calendar',
-        type=str,
-        default=None,
-        help='Path to calendar JSON file (default: data/calendar.json)'
-    )
-    
-    # Schedule command
-    schedule_parser = subparsers.add_parser('schedule', help='Schedule a meeting')
-    schedule_parser.add_argument('--subject', type=str, required=True, help='Meeting subject')
-    schedule_parser.add_argument('--participants', type=str, required=True, help='Comma-separated list of participants')
-    schedule_parser.add_argument('--duration', type=int, default=60, help='Duration in minutes (default: 60)')
-    schedule_parser.add_argument('--date', type=str, default='tomorrow', help='Preferred date (default: tomorrow)')
-    schedule_parser.add_argument('--location', type=str, default='TBD', help='Meeting location (default: TBD)')
+    # Only build the subparser for the requested command; fall back to all
+    # of them for --help, a missing command, or an unknown one
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in SUBCOMMAND_PARSERS:
+        SUBCOMMAND_PARSERS[command](subparsers)
+    else:
+        for add_parser in SUBCOMMAND_PARSERS.values():
+            add_parser(subparsers)
     
     # Parse arguments
     args = parser.parse_args()
@@ -66,6 +87,9 @@ Examples:
         parser.print_help()
         return 1
     
+    # Imported here so `--help` and argument errors skip the agent import chain
+    from workflows.orchestrator import ProFlowOrchestrator
+    
     # Initialize orchestrator
     orchestrator = ProFlowOrchestrator()
     
@@ -91,7 +115,7 @@ Examples:
         return 1
 
 
-def handle_briefing(orchestrator: ProFlowOrchestrator, args):
+def handle_briefing(orchestrator: 'ProFlowOrchestrator', args):
     """Handle the briefing command."""
     print("="*60)
     print("PROFLOW - DAILY BRIEFING")
@@ -123,29 +147,33 @@ def handle_briefing(orchestrator: ProFlowOrchestrator, args):
     print("="*60)
     print(f"\n{briefing['summary']}\n")
     
+    components = briefing['components']
+    
     # Email Intelligence
-    email_comp = briefing['components']['email_intelligence']
+    email_comp = components['email_intelligence']
+    high_priority = email_comp['high_priority']
+    action_items = email_comp['action_items']
     print("📧 EMAIL INTELLIGENCE")
     print("-" * 60)
     print(f"Total emails: {email_comp['total_emails']}")
-    print(f"High priority: {len(email_comp['high_priority'])}")
+    print(f"High priority: {len(high_priority)}")
     print(f"Medium priority: {len(email_comp['medium_priority'])}")
     print(f"Low priority: {len(email_comp['low_priority'])}")
-    print(f"Action items: {len(email_comp['action_items'])}")
+    print(f"Action items: {len(action_items)}")
     print(f"Meeting requests: {len(email_comp['meeting_requests'])}")
     
-    if email_comp['high_priority']:
+    if high_priority:
         print("\n  High Priority Emails:")
-        for email in email_comp['high_priority']:
+        for email in high_priority:
             print(f"    • {email['subject']} (from: {email['from']}, urgency: {email['urgency_score']}/10)")
     
-    if email_comp['action_items']:
+    if action_items:
         print("\n  Action Items:")
-        for item in email_comp['action_items'][:5]:  # Show first 5
+        for item in action_items[:5]:  # Show first 5
             print(f"    • {item.get('task', 'N/A')} (priority: {item.get('priority', 'N/A')})")
     
     # Calendar Optimization
-    calendar_comp = briefing['components']['calendar_optimization']
+    calendar_comp = components['calendar_optimization']
     print("\n📅 CALENDAR OPTIMIZATION")
     print("-" * 60)
     print(f"Total meetings: {calendar_comp['total_meetings']}")
@@ -153,18 +181,21 @@ def handle_briefing(orchestrator: ProFlowOrchestrator, args):
     print(f"Focus time available: {calendar_comp['focus_time_minutes']} minutes")
     print(f"Optimization score: {calendar_comp['optimization_score']:.1f}/100")
     
-    if calendar_comp['conflicts']:
+    conflicts = calendar_comp['conflicts']
+    suggestions = calendar_comp['suggestions']
+    
+    if conflicts:
         print("\n  ⚠️ Conflicts detected:")
-        for conflict in calendar_comp['conflicts']:
+        for conflict in conflicts:
             print(f"    • {conflict.get('event1', 'N/A')} conflicts with {conflict.get('event2', 'N/A')}")
     
-    if calendar_comp['suggestions']:
+    if suggestions:
         print("\n  💡 Suggestions:")
-        for suggestion in calendar_comp['suggestions']:
+        for suggestion in suggestions:
             print(f"    • [{suggestion.get('priority', 'medium').upper()}] {suggestion.get('details', 'N/A')}")
     
     # Meeting Preparation
-    meeting_comp = briefing['components']['meeting_preparation']
+    meeting_comp = components['meeting_preparation']
     print("\n📋 MEETING PREPARATION")
     print("-" * 60)
     print(f"Meetings prepared: {len(meeting_comp)}")
@@ -180,7 +211,7 @@ def handle_briefing(orchestrator: ProFlowOrchestrator, args):
     return 0
 
 
-def handle_schedule(orchestrator: ProFlowOrchestrator, args):
+def handle_schedule(orchestrator: 'ProFlowOrchestrator', args):
     """Handle the schedule command."""
     print("="*60)
     print("PROFLOW - MEETING SCHEDULING")
@@ -0,0 +1,6 @@
+"""
+Agents for ProFlow Agent.
+
+Modules are imported individually (e.g. agents.email_intelligence_agent)
+so the Google SDKs are only loaded by the agents that use them.
+"""
@@ -12,6 +12,12 @@ from messaging.message_bus import message_bus, AgentMessage, MessageType
 class BaseAgent:
     """Base class for all agents with messaging capability"""
     
+    # Message type -> handler method name (types not listed are ignored)
+    _DISPATCH = {
+        MessageType.REQUEST: '_handle_request_message',
+        MessageType.BROADCAST: '_handle_broadcast_message',
+    }
+    
     def __init__(self, name: str):
         """
         Initialize base agent.
@@ -25,6 +31,18 @@ class BaseAgent:
         self.logger = logging.getLogger(name)
         self.logger.info(f"Agent '{name}' initialized with messaging")
     
+    def close(self):
+        """Unsubscribe this agent from the message bus."""
+        self.message_bus.unsubscribe(self.name, self.handle_message)
+    
+    def __del__(self):
+        # The bus holds a reference to handle_message, so this only runs once
+        # the agent has been replaced or closed; close() is then a no-op.
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def handle_message(self, message: AgentMessage):
         """
         Handle incoming messages.
@@ -32,27 +50,43 @@ class BaseAgent:
         Args:
             message: Incoming AgentMessage
         """
-        self.logger.info(f"Received message from {message.sender}: {message.message_type.value}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Received message from {message.sender}: {message.message_type.value}")
         
-        if message.message_type == MessageType.REQUEST:
-            response = self.process_request(message.content)
-            self.send_message(
-                receiver=message.sender,
-                message_type=MessageType.RESPONSE,
-                content=response
-            )
-        elif message.message_type == MessageType.BROADCAST:
-            self.process_broadcast(message.content)
+        handler_name = self._DISPATCH.get(message.message_type)
+        if handler_name is not None:
+            getattr(self, handler_name)(message)
+    
+    def _handle_request_message(self, message: AgentMessage):
+        """Process a request and reply to the sender."""
+        response = self.process_request(message.content)
+        self.send_message(
+            receiver=message.sender,
+            message_type=MessageType.RESPONSE,
+            content=response
+        )
+    
+    def _handle_broadcast_message(self, message: AgentMessage):
+        """Process a broadcast."""
+        self.process_broadcast(message.content)
     
     def send_message(self, receiver: str, message_type: MessageType, content: Dict):
         """
         Send message to another agent.
         
+        Messages to named receivers that aren't subscribed are dropped
+        without being built or recorded in the bus history; "ALL" is
+        always published so the bus can broadcast it.
+        
         Args:
             receiver: Receiver agent name
             message_type: Type of message
             content: Message content dictionary
         """
+        if receiver != "ALL" and not self.message_bus.has_subscriber(receiver):
+            self.logger.debug(f"No subscriber '{receiver}', dropping {message_type.value} message")
+            return
+        
         message = AgentMessage(
             sender=self.name,
             receiver=receiver,
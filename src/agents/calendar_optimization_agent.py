@@ -3,53 +3,121 @@ Calendar agent - finds conflicts and protects focus time
 Still needs timezone handling but works for single location
 """
 
-from google import genai
-from google.genai import types
+import hashlib
+import json
 import sys
 import os
+from array import array
+from heapq import heappop, heappush
+from itertools import accumulate
+from typing import List
 
-# hack to import tools from parent dir
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pydantic import BaseModel
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
+
+# only needed when run directly as a script - as part of the agents
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import calendar_tools
+from agents.instructions import load_instruction
+from agents.clients import get_genai_client, with_service_tier
+from agents.response_cache import ResponseCache
 
 
-def create_calendar_agent():
-    """Setup calendar agent"""
-    
-    client = genai.Client()
-    
-    tools = [
-        calendar_tools.analyze_schedule,
-        calendar_tools.find_available_slots,
-        calendar_tools.suggest_meeting_reschedule
-    ]
-    
-    # keeping this shorter - the long version was overkill
-    instruction = """You optimize executive calendars.
+MODEL = 'gemini-2.0-flash-exp'
+# small conflict-free days go to the cheaper, faster tier
+LITE_MODEL = 'gemini-2.5-flash-lite'
+LITE_MAX_MEETINGS = 5
+
+# local score at or above this (with no conflicts) skips the LLM call
+CLEAN_SCHEDULE_SCORE = 9
+MIN_BUFFER_MINUTES = 15
+MAX_BACK_TO_BACK = 3
+FOCUS_BLOCK_MINUTES = 90
+WORKDAY_START = 9 * 60
+WORKDAY_END = 17 * 60
+# long conflict lists are summarized in the prompt rather than spelled out
+MAX_LISTED_CONFLICTS = 10
+
+_CALENDAR_TOOLS = (
+    calendar_tools.analyze_schedule,
+    calendar_tools.find_available_slots,
+    calendar_tools.suggest_meeting_reschedule,
+)
+
+class ScheduleAnalysis(BaseModel):
+    """Structured answer for one day's schedule"""
+    score: int
+    problems: List[str]
+    fixes: List[str]
+    reschedule: List[str] = []
+
+
+class DayScheduleAnalysis(ScheduleAnalysis):
+    """One day's entry in a batch answer"""
+    day: int
+
 
-Key goals:
-- Protect 90+ min blocks for deep work (mornings preferred)
-- Add 15min buffers between meetings
-- Avoid 3+ back-to-back meetings
-- Group similar meetings when possible
+# built once on first use - the client keeps its connection pool warm
+_calendar_agent = None
+# response schema -> JSON-output config, built once per schema
+_structured_configs = {}
 
-When analyzing:
-- Score schedule quality (0-10)
-- Flag conflicts and problems
-- Give 3 specific fixes
-- Be practical about what can actually move
+# fixed prompt tails - only the events summary is filled in per call
+_QUERY_TEMPLATE = """%s
+
+Analyze and provide:
+1. Schedule score (0-10)
+2. Main problems
+3. Top 3 fixes
+4. Specific rescheduling suggestions
+"""
+
+_BATCH_QUERY_TEMPLATE = """%s
+
+For each day above, provide:
+1. Schedule score (0-10)
+2. Main problems
+3. Top 3 fixes
+4. Specific rescheduling suggestions
 
-Keep recommendations short and actionable.
+Return one entry per day, using the day number shown.
 """
+
+RESPONSE_CACHE_SIZE = 1024
+# prompt hash -> response text; called from worker threads too
+# (asyncio.to_thread, the orchestrator's executor), so it's the locked cache
+_response_cache = ResponseCache(ttl_seconds=3600, max_entries=RESPONSE_CACHE_SIZE)
+# above this the answers vary too much between calls to reuse
+MAX_CACHEABLE_TEMPERATURE = 0.5
+
+
+def create_calendar_agent():
+    """Setup calendar agent (cached after the first call)"""
+    global _calendar_agent
+    if _calendar_agent is not None:
+        return _calendar_agent
+    
+    # SDK imported here so importing this module stays cheap
+    from google.genai import types
+    
+    client = get_genai_client()
     
     agent_config = types.GenerateContentConfig(
-        system_instruction=instruction,
-        tools=tools,
+        system_instruction=load_instruction('calendar_agent'),
+        tools=list(_CALENDAR_TOOLS),
         temperature=0.3,  # consistent results
     )
     
-    return client, agent_config
+    _calendar_agent = (client, agent_config)
+    return _calendar_agent
 
 
 def analyze_daily_schedule(calendar_events, user_preferences=None):
@@ -63,35 +131,437 @@ def analyze_daily_schedule(calendar_events, user_preferences=None):
     Returns:
         Analysis text with suggestions
     """
+    metrics = _score_schedule(calendar_events)
+    
+    # clean days don't need the model - answer locally
+    if _is_clean(metrics):
+        return _clean_day_text(metrics)
+    
     client, config = create_calendar_agent()
+    model = _select_model(calendar_events, metrics)
+    return _generate(client, config, _schedule_query(calendar_events, metrics), model)
+
+
+async def analyze_daily_schedule_async(calendar_events, user_preferences=None):
+    """
+    Same as analyze_daily_schedule but awaits the model instead of blocking
     
-    # format the events
-    events_summary = f"Analyzing {len(calendar_events)} meetings:\n"
-    for event in calendar_events:
-        events_summary += f"- {event.get('summary')}: {event.get('start')} - {event.get('end')}\n"
+    Lets a caller run the calendar analysis alongside other agents (e.g.
+    with asyncio.gather) so the day's brief takes as long as the slowest
+    agent rather than the sum of them.
+    
+    Args:
+        calendar_events: List of meetings
+        user_preferences: Optional prefs (not used yet)
+    
+    Returns:
+        Analysis text with suggestions
+    """
+    metrics = _score_schedule(calendar_events)
+    
+    if _is_clean(metrics):
+        return _clean_day_text(metrics)
+    
+    client, config = create_calendar_agent()
+    query = _schedule_query(calendar_events, metrics)
+    model = _select_model(calendar_events, metrics)
+    
+    key, cached = _cached_response(config, query, model)
+    if cached is not None:
+        return cached
     
-    query = f"""{events_summary}
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=query,
+        config=config
+    )
+    
+    _store_response(key, response.text)
+    
+    return response.text
 
-Analyze and provide:
-1. Schedule score (0-10)
-2. Main problems
-3. Top 3 fixes
-4. Specific rescheduling suggestions
-"""
+
+def analyze_daily_schedule_stream(calendar_events, user_preferences=None):
+    """
+    Same as analyze_daily_schedule but yields the answer as it's generated
+    
+    Args:
+        calendar_events: List of meetings
+        user_preferences: Optional prefs (not used yet)
+    
+    Yields:
+        Chunks of analysis text - the first arrives after ~1 round trip
+        instead of after the whole answer is done
+    """
+    metrics = _score_schedule(calendar_events)
+    
+    if _is_clean(metrics):
+        yield _clean_day_text(metrics)
+        return
+    
+    client, config = create_calendar_agent()
+    query = _schedule_query(calendar_events, metrics)
+    model = _select_model(calendar_events, metrics)
+    
+    key, cached = _cached_response(config, query, model)
+    if cached is not None:
+        yield cached
+        return
+    
+    parts = []
+    for chunk in client.models.generate_content_stream(
+        model=model,
+        contents=query,
+        config=config
+    ):
+        if chunk.text:
+            parts.append(chunk.text)
+            yield chunk.text
+    
+    # only a fully received answer goes in the cache
+    _store_response(key, "".join(parts))
+
+
+def analyze_daily_schedule_structured(calendar_events, user_preferences=None):
+    """
+    Same as analyze_daily_schedule but returns parsed fields instead of prose
+    
+    Args:
+        calendar_events: List of meetings
+        user_preferences: Optional prefs (not used yet)
+    
+    Returns:
+        Dict with score, problems, fixes, reschedule (see ScheduleAnalysis)
+    """
+    metrics = _score_schedule(calendar_events)
+    
+    if _is_clean(metrics):
+        return ScheduleAnalysis(score=metrics['score'], problems=[], fixes=[]).model_dump()
+    
+    client, config = create_calendar_agent()
+    structured_config = _structured_config(config, ScheduleAnalysis)
+    model = _select_model(calendar_events, metrics)
+    text = _generate(client, structured_config, _schedule_query(calendar_events, metrics), model)
+    return _json_loads(text)
+
+
+def _clean_day_text(metrics):
+    """Local answer for a day that needs no changes"""
+    return (
+        f"Schedule score: {metrics['score']}/10\n\n"
+        f"No conflicts, buffers look fine, and the longest focus block is "
+        f"{metrics['longest_focus_minutes']} min. Nothing needs to move today."
+    )
+
+
+def _is_clean(metrics):
+    """True if the local checks say the day needs no changes"""
+    return bool(metrics) and not metrics['conflicts'] and metrics['score'] >= CLEAN_SCHEDULE_SCORE
+
+
+def _select_model(calendar_events, metrics):
+    """
+    Pick the model tier for a day
+    
+    Short days the local checks found no conflicts in are easy enough for
+    the lite model; anything bigger, conflicted or unparseable escalates
+    to the full flash model.
+    """
+    if metrics and not metrics['conflicts'] and len(calendar_events) <= LITE_MAX_MEETINGS:
+        return LITE_MODEL
+    return MODEL
+
+
+def _schedule_query(calendar_events, metrics):
+    """Prompt for a single day, with the local metrics when available"""
+    events_summary = _format_events(calendar_events)
+    if metrics:
+        events_summary += _format_metrics(metrics)
+    
+    return _QUERY_TEMPLATE % events_summary
+
+
+def _structured_config(config, schema):
+    """
+    JSON-output variant of the agent config for the given response schema
+    
+    Built once per schema and shared between calls, so callers must not
+    modify the returned config.
+    """
+    structured = _structured_configs.get(schema)
+    if structured is not None:
+        return structured
+    
+    from google.genai import types
+    
+    # structured output can't be combined with tool calls, so no tools here
+    structured = types.GenerateContentConfig(
+        system_instruction=config.system_instruction,
+        temperature=config.temperature,
+        response_mime_type='application/json',
+        response_schema=schema,
+    )
+    _structured_configs[schema] = structured
+    return structured
+
+
+def _generate(client, config, query, model=MODEL):
+    """Call the model, reusing a cached answer for an identical request"""
+    key, cached = _cached_response(config, query, model)
+    if cached is not None:
+        return cached
     
     response = client.models.generate_content(
-        model='gemini-2.0-flash-exp',
+        model=model,
         contents=query,
         config=config
     )
     
+    _store_response(key, response.text)
+    
     return response.text
 
 
-if __name__ == "__main__":
-    print("Calendar Agent Test")
-    print("-" * 40)
+def _is_cacheable(config):
+    """Low-temperature answers are stable enough to reuse"""
+    return (config.temperature or 0) <= MAX_CACHEABLE_TEMPERATURE
+
+
+def _cached_response(config, query, model=MODEL):
+    """
+    (cache key, cached answer or None) for a request
+    
+    The key is None when answers at the config's temperature aren't reused,
+    so _store_response then skips the store.
+    """
+    if not _is_cacheable(config):
+        return None, None
+    key = _response_cache_key(config, query, model)
+    return key, _response_cache.get(key)
+
+
+def _store_response(key, text):
+    """Remember an answer under the key from _cached_response"""
+    if key is not None:
+        _response_cache.put(key, text)
+
+
+def _response_cache_key(config, query, model=MODEL):
+    """Content hash of everything that shapes the answer"""
+    parts = (model, config.system_instruction or "", config.response_mime_type or "", query)
+    return hashlib.blake2b("\0".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def analyze_daily_schedules_batch(schedules, user_preferences=None):
+    """
+    Check several days at once - one Gemini call instead of one per day
+    
+    Args:
+        schedules: List of days, each a list of meetings
+        user_preferences: Optional prefs (not used yet)
+    
+    Returns:
+        List of dicts (day, score, problems, fixes, reschedule), one per day
+    """
+    if not schedules:
+        return []
+    
+    client, config = create_calendar_agent()
+    batch_config = _structured_config(config, List[DayScheduleAnalysis])
+    
+    sections = "\n".join(
+        f"Day {day}:\n{_format_events(events)}"
+        for day, events in enumerate(schedules, 1)
+    )
+    
+    query = _BATCH_QUERY_TEMPLATE % sections
+    
+    # several days at once is offline work - the cheaper flex tier is fine
+    response = client.models.generate_content(
+        model=MODEL,
+        contents=query,
+        config=with_service_tier(batch_config, 'flex')
+    )
+    
+    results = _json_loads(response.text)
+    return sorted(results, key=lambda r: r.get('day', 0))
+
+
+def _to_minutes(value):
+    """'09:30' or '2024-11-20T09:30:00' -> minutes since midnight (None if unparseable)"""
+    try:
+        hours, minutes = str(value).rsplit('T', 1)[-1].split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    except (ValueError, TypeError):
+        return None
+
+
+def _events_to_arrays(calendar_events):
+    """
+    Parse a day's events once into parallel minute-of-day arrays
     
+    Args:
+        calendar_events: List of meetings with start/end times
+    
+    Returns:
+        (starts, ends, summaries) sorted by start time, with starts/ends as
+        int arrays of minutes since midnight - or None if any time can't
+        be parsed
+    """
+    parsed = []
+    for event in calendar_events:
+        start = _to_minutes(event.get('start'))
+        end = _to_minutes(event.get('end'))
+        if start is None or end is None:
+            return None
+        parsed.append((start, end, event.get('summary', 'Untitled')))
+    parsed.sort()
+    
+    starts = array('i', (start for start, _, _ in parsed))
+    ends = array('i', (end for _, end, _ in parsed))
+    summaries = [summary for _, _, summary in parsed]
+    return starts, ends, summaries
+
+
+def _score_schedule(calendar_events):
+    """
+    Quick deterministic check of a day - conflicts, buffers, focus time
+    
+    Args:
+        calendar_events: List of meetings with start/end times
+    
+    Returns:
+        Dict of metrics with a 0-10 score, or None if any time can't be parsed
+    """
+    arrays = _events_to_arrays(calendar_events)
+    if arrays is None:
+        return None
+    starts, ends, summaries = arrays
+    
+    if not starts:
+        return {
+            'score': 10,
+            'conflicts': [],
+            'short_buffers': 0,
+            'longest_back_to_back': 0,
+            'longest_focus_minutes': WORKDAY_END - WORKDAY_START,
+        }
+    
+    # busy_until[i] is the latest end among meetings 0..i, so the gap after
+    # a meeting nested inside a longer one is measured from the longer one
+    busy_until = list(accumulate(ends, max))
+    
+    # gaps[i] is the free time before meeting i + 1 (negative = overlap)
+    gaps = [start - busy for start, busy in zip(starts[1:], busy_until)]
+    
+    conflicts = [
+        f"{summaries[i]} overlaps {summaries[j]}"
+        for i, j in _sweep_conflicts(starts, ends)
+    ]
+    short_buffers = sum(1 for gap in gaps if 0 <= gap < MIN_BUFFER_MINUTES)
+    
+    run = longest_run = 1
+    for gap in gaps:
+        run = run + 1 if gap <= 0 else 1
+        longest_run = max(longest_run, run)
+    
+    # free time before the first and after the last meeting counts too
+    longest_focus = max(
+        starts[0] - WORKDAY_START,
+        WORKDAY_END - busy_until[-1],
+        *gaps,
+        0
+    )
+    
+    score = 10 - 3 * len(conflicts) - short_buffers
+    if longest_run > MAX_BACK_TO_BACK:
+        score -= 2
+    if longest_focus < FOCUS_BLOCK_MINUTES:
+        score -= 2
+    
+    return {
+        'score': max(score, 0),
+        'conflicts': conflicts,
+        'short_buffers': short_buffers,
+        'longest_back_to_back': longest_run,
+        'longest_focus_minutes': longest_focus,
+    }
+
+
+def find_conflicts(calendar_events):
+    """
+    Find every pair of overlapping meetings
+    
+    Sorted sweep with a heap of running meetings - O(N log N + k) for k
+    overlapping pairs instead of checking all N^2 pairs.
+    
+    Args:
+        calendar_events: List of meetings with start/end times
+    
+    Returns:
+        List of (i, j) index pairs into calendar_events with i < j. Events
+        whose times can't be parsed are skipped.
+    """
+    parsed = []
+    for index, event in enumerate(calendar_events):
+        start = _to_minutes(event.get('start'))
+        end = _to_minutes(event.get('end'))
+        if start is not None and end is not None:
+            parsed.append((start, end, index))
+    parsed.sort()
+    
+    starts = [start for start, _, _ in parsed]
+    ends = [end for _, end, _ in parsed]
+    pairs = []
+    for i, j in _sweep_conflicts(starts, ends):
+        a, b = parsed[i][2], parsed[j][2]
+        pairs.append((a, b) if a < b else (b, a))
+    return sorted(pairs)
+
+
+def _sweep_conflicts(starts, ends):
+    """
+    Overlapping pairs among meetings already sorted by start
+    
+    Returns:
+        List of (i, j) positions in the sorted order, i < j
+    """
+    running = []  # heap of (end, position) for meetings not yet over
+    pairs = []
+    for j, (start, end) in enumerate(zip(starts, ends)):
+        while running and running[0][0] <= start:
+            heappop(running)
+        pairs.extend((i, j) for i in sorted(i for _, i in running))
+        heappush(running, (end, j))
+    return pairs
+
+
+def _format_metrics(metrics):
+    """Precomputed checks as prompt bullets so the model doesn't redo them"""
+    conflicts = metrics['conflicts']
+    listed = ", ".join(conflicts[:MAX_LISTED_CONFLICTS]) or "none"
+    if len(conflicts) > MAX_LISTED_CONFLICTS:
+        listed += f", and {len(conflicts) - MAX_LISTED_CONFLICTS} more"
+    return (
+        "\nPrecomputed checks:\n"
+        f"- Local score: {metrics['score']}/10\n"
+        f"- Conflicts ({len(conflicts)}): {listed}\n"
+        f"- Buffers under {MIN_BUFFER_MINUTES} min: {metrics['short_buffers']}\n"
+        f"- Longest back-to-back run: {metrics['longest_back_to_back']} meetings\n"
+        f"- Longest focus block: {metrics['longest_focus_minutes']} min\n"
+    )
+
+
+def _format_events(calendar_events):
+    """Format a day's events as a bullet list for the prompt"""
+    lines = "".join(
+        f"- {event.get('summary')}: {event.get('start')} - {event.get('end')}\n"
+        for event in calendar_events
+    )
+    return f"Analyzing {len(calendar_events)} meetings:\n{lines}"
+
+
+if __name__ == "__main__":
     # typical packed day
     test_schedule = [
         {'summary': 'Standup', 'start': '09:00', 'end': '09:30'},
@@ -103,16 +573,18 @@ if __name__ == "__main__":
         {'summary': 'Team Sync', 'start': '16:30', 'end': '17:00'}
     ]
     
-    print("Today:")
-    for event in test_schedule:
-        print(f"  {event['start']}: {event['summary']}")
-    
-    print("\nAnalyzing...")
-    print("-" * 40)
+    # header and schedule go out in one write instead of a line at a time
+    lines = ["Calendar Agent Test", "-" * 40, "Today:"]
+    lines.extend(f"  {event['start']}: {event['summary']}" for event in test_schedule)
+    lines += ["", "Analyzing...", "-" * 40]
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     
     try:
-        result = analyze_daily_schedule(test_schedule)
-        print(result)
+        # stream so the answer shows up as it's generated
+        for text in analyze_daily_schedule_stream(test_schedule):
+            print(text, end='', flush=True)
+        print()
         
     except Exception as e:
         print(f"Error: {e}")
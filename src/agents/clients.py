@@ -0,0 +1,91 @@
+"""
+Shared API clients for the agents.
+
+Every agent that talks to Gemini uses the one client returned here, so the
+process keeps a single connection pool instead of one per agent.
+"""
+
+import os
+import threading
+from functools import lru_cache
+
+
+# Created on first use
+_genai_client = None
+# Agents are built from worker threads too (thread pools, asyncio.to_thread)
+_client_lock = threading.Lock()
+
+# Interactive calls ask for 'priority', bulk/offline calls for 'flex'
+SERVICE_TIERS = ('priority', 'standard', 'flex')
+SERVICE_TIER_HEADER = 'x-goog-service-tier'
+
+# (id(config), tier) -> (config, tiered copy); the base config is kept so
+# its id can't be reused by another object
+_tiered_configs = {}
+
+
+def get_genai_client():
+    """
+    Get the process-wide google-genai client.
+    
+    Returns:
+        genai.Client instance
+    """
+    global _genai_client
+    if _genai_client is None:
+        with _client_lock:
+            # another thread may have created it while we waited
+            if _genai_client is None:
+                # SDK imported here so importing this module stays cheap
+                from google import genai
+                _genai_client = genai.Client()
+    return _genai_client
+
+
+@lru_cache(maxsize=1)
+def ensure_vertex_init():
+    """
+    Init Vertex AI for the ADK agents, once per process.
+    
+    Called when an agent is built rather than at import, so modules that
+    only use the local tools never pay for SDK bootstrap and credential
+    discovery.
+    """
+    import vertexai
+    vertexai.init(
+        project=os.getenv('GOOGLE_CLOUD_PROJECT'),
+        location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
+    )
+
+
+def with_service_tier(config, tier: str):
+    """
+    Get a copy of a GenerateContentConfig that requests a service tier.
+    
+    The copy is made once per config and tier, so the agents' shared
+    configs are never modified and repeat calls don't rebuild anything.
+    
+    Args:
+        config: Base GenerateContentConfig
+        tier: One of SERVICE_TIERS. 'standard' returns config unchanged.
+    
+    Returns:
+        GenerateContentConfig for the requested tier
+    
+    Raises:
+        ValueError: If tier is not a known service tier
+    """
+    if tier not in SERVICE_TIERS:
+        raise ValueError(f"Unknown service tier: {tier} (expected one of {SERVICE_TIERS})")
+    if tier == 'standard':
+        return config
+    
+    key = (id(config), tier)
+    cached = _tiered_configs.get(key)
+    if cached is None:
+        from google.genai import types
+        tiered = config.model_copy(update={
+            'http_options': types.HttpOptions(headers={SERVICE_TIER_HEADER: tier})
+        })
+        cached = _tiered_configs[key] = (config, tiered)
+    return cached[1]
@@ -3,69 +3,146 @@ Email agent - handles the daily email firehose
 Works pretty well after fixing the duration bug
 """
 
+import asyncio
+import bisect
 import os
-from dotenv import load_dotenv
-import vertexai
-from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
 
-load_dotenv()
-
-vertexai.init(
-    project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-    location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-)
+# deployed workers get their env from the orchestrator - only local dev
+# (PROFLOW_USE_DOTENV=1) pays for finding and parsing a .env file
+if os.getenv('PROFLOW_USE_DOTENV'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# only needed when run directly as a script
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tools.email_tools import (
+    analyze_email,
     classify_email_priority,
     extract_meeting_requests,
     extract_action_items
 )
 from state.session_manager import SessionManager
+from agents.instructions import load_instruction
+from agents.clients import ensure_vertex_init
+
+
+# the agent's tools - a tuple so the set can't drift between callers
+_EMAIL_TOOLS = (
+    classify_email_priority,
+    extract_meeting_requests,
+    extract_action_items,
+)
+
+# built once on first use and shared by later callers
+_email_agent = None
 
 
 def create_email_intelligence_agent():
-    """Setup email agent. Returns (client, config)"""
+    """
+    Setup email agent (cached after the first call). Returns the LlmAgent
+    
+    Thinking is switched off (budget 0): triage is short classification
+    and extraction that the tools do most of, so thinking tokens would only
+    add latency and cost. Meeting briefings are the place for reasoning.
+    """
+    global _email_agent
+    if _email_agent is not None:
+        return _email_agent
+    
+    ensure_vertex_init()
+    from google.adk.agents import LlmAgent
+    from google.adk.models.google_llm import Gemini
+    from google.adk.planners import BuiltInPlanner
+    from google.genai import types
     
-    agent = LlmAgent(
+    _email_agent = LlmAgent(
         model=Gemini(model="gemini-2.5-flash-lite"),
         name="email_intelligence_agent",
         description="Email analysis with priority detection",
-        instruction="""
-        Analyze emails for busy people. Be direct.
-        
-        Use all three tools to analyze each email:
-        1. classify_email_priority - get urgency score (0-10)
-        2. extract_meeting_requests - find meeting details
-        3. extract_action_items - pull out tasks
-        
-        Quick rules:
-        - High priority: urgency 5+, needs action today
-        - Medium: urgency 3-4, handle this week  
-        - Low: everything else
-        - If from C-suite or has URGENT/ASAP, bump priority
-        
-        Output format:
-        Priority: [HIGH/MEDIUM/LOW] (Score: X/10)
-        Why: [1 line reason]
-        Category: [escalation/meeting/decision/question/fyi]
-        Actions: [list if any]
-        Meeting: [details if found]
-        Recommend: [what to do]
-        Summary: [2 sentences max]
-        
-        Keep it short. No walls of text.
-        """,
-        tools=[
-            classify_email_priority,
-            extract_meeting_requests,
-            extract_action_items
-        ]
+        instruction=load_instruction('email_agent'),
+        tools=list(_EMAIL_TOOLS),  # ADK expects a list
+        # ADK takes thinking settings through the planner, not the config
+        planner=BuiltInPlanner(
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
     )
     
-    return agent
+    return _email_agent
+
+
+# most history entries the writer thread hands the session in one go
+HISTORY_BATCH_SIZE = 64
+# longest (seconds) a queued entry waits before the writer saves it
+HISTORY_FLUSH_INTERVAL = 0.25
+
+# queued by flush_history so the writer saves a partial batch right away
+_FLUSH = object()
+
+
+def _history_writer(history_queue: queue.Queue, session_manager: SessionManager):
+    """
+    Background loop that moves queued history entries into the session.
+    
+    Collects entries until HISTORY_BATCH_SIZE have queued up or the first
+    one has waited HISTORY_FLUSH_INTERVAL, then adds them with one
+    add_history_entries call - a steady stream of emails costs one session
+    save per batch instead of one per entry. A _FLUSH marker ends the batch
+    early; a None entry ends it and stops the loop.
+    """
+    while True:
+        batch = [history_queue.get()]
+        deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+        while batch[-1] is not None and batch[-1] is not _FLUSH and len(batch) < HISTORY_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(history_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        entries = [entry for entry in batch if entry is not None and entry is not _FLUSH]
+        try:
+            if entries:
+                session_manager.add_history_entries(entries)
+        finally:
+            for _ in batch:
+                history_queue.task_done()
+        
+        if batch[-1] is None:
+            return
+
+
+def _stop_history_writer(history_queue: queue.Queue, thread: threading.Thread):
+    """Write out anything still queued and stop the writer thread."""
+    history_queue.put(None)
+    thread.join(timeout=5)
+
+
+# upper bounds (approx tokens) of the length buckets used to order a batch;
+# anything longer goes in a final open-ended bucket
+EMAIL_TOKEN_BUCKETS = (256, 1024, 4096)
+EMAIL_BUCKET_LABELS = ('<256', '256-1k', '1k-4k', '4k+')
+
+
+def _token_bucket(subject: str, body: str) -> int:
+    """Index of the EMAIL_TOKEN_BUCKETS bucket an email falls in (~4 chars per token)"""
+    return bisect.bisect_right(EMAIL_TOKEN_BUCKETS, (len(subject) + len(body)) // 4)
+
+
+def _email_fields(email: Dict):
+    """Pull (subject, sender, body, timestamp) out of an email dict in one go"""
+    get = email.get
+    return get('subject', ''), get('from', ''), get('body', ''), get('timestamp', '')
 
 
 class StatefulEmailAgent:
@@ -79,6 +156,13 @@ class StatefulEmailAgent:
     - Log all actions to history
     """
     
+    # Use the email tools directly (no LLM agent needed for this demo).
+    # Class-level so they're bound once, not copied onto every instance.
+    classify_email_priority = staticmethod(classify_email_priority)
+    extract_meeting_requests = staticmethod(extract_meeting_requests)
+    extract_action_items = staticmethod(extract_action_items)
+    analyze_email = staticmethod(analyze_email)
+    
     def __init__(self, session_manager: SessionManager = None):
         """
         Initialize StatefulEmailAgent.
@@ -92,10 +176,40 @@ class StatefulEmailAgent:
         else:
             self.session_manager = session_manager
         
-        # Use the email tools directly (no LLM agent needed for this demo)
-        self.classify_email_priority = classify_email_priority
-        self.extract_meeting_requests = extract_meeting_requests
-        self.extract_action_items = extract_action_items
+        # Recent analyses by email_id, most recently used last - repeat
+        # lookups skip the session manager entirely
+        self._hot_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._hot_cap = 1024
+        
+        # History entries are written by a background thread so the session
+        # save they trigger isn't paid for on the per-email path
+        self._history_queue: queue.Queue = queue.Queue()
+        history_thread = threading.Thread(
+            target=_history_writer,
+            args=(self._history_queue, self.session_manager),
+            name="email-history-writer",
+            daemon=True
+        )
+        history_thread.start()
+        # stops the thread on close(), garbage collection or interpreter exit
+        self._stop_history = weakref.finalize(
+            self, _stop_history_writer, self._history_queue, history_thread
+        )
+    
+    def _log_history(self, action: str, details: Dict):
+        """Queue a history entry for the background writer."""
+        self._history_queue.put((datetime.now().isoformat(), action, details))
+    
+    def flush_history(self):
+        """Block until every queued history entry is in the session."""
+        if not self._stop_history.alive:
+            return  # closed - the writer already wrote everything out
+        self._history_queue.put(_FLUSH)
+        self._history_queue.join()
+    
+    def close(self):
+        """Write out queued history and stop the background writer."""
+        self._stop_history()
     
     def process_email(self, email: Dict) -> Dict:
         """
@@ -107,51 +221,72 @@ class StatefulEmailAgent:
         Returns:
             Analysis result dictionary
         """
+        subject, sender, body, timestamp = _email_fields(email)
+        
         # Generate unique email ID
         email_id = self.session_manager.generate_email_id(email)
         
         # Check if email was already processed
-        if self.session_manager.is_email_processed(email_id):
-            cached_result = self.session_manager.get_email_analysis(email_id)
-            self.session_manager.add_to_history('email_cache_hit', {
-                'email_id': email_id,
-                'subject': email.get('subject', 'Unknown')
-            })
-            return {
-                **cached_result,
-                'from_cache': True,
-                'email_id': email_id
-            }
+        cached_analysis = self._lookup_analysis(email_id)
+        if cached_analysis is not None:
+            return self._cached_result(email_id, subject, cached_analysis)
         
         # Process email (not cached)
-        self.session_manager.add_to_history('email_processing_start', {
+        self._log_processing_start(email_id, subject)
+        analysis = self.analyze_email(subject, sender, body)
+        return self._store_result(email_id, subject, sender, timestamp, analysis)
+    
+    def _lookup_analysis(self, email_id: str) -> Optional[Dict]:
+        """Stored analysis for an email, checking the hot cache before the session."""
+        analysis = self._hot_cache.get(email_id)
+        if analysis is not None:
+            self._hot_cache.move_to_end(email_id)
+            return analysis
+        
+        analysis = self.session_manager.get_email_analysis(email_id)
+        if analysis is not None:
+            self._remember(email_id, analysis)
+        return analysis
+    
+    def _remember(self, email_id: str, analysis: Dict):
+        """Add an analysis to the hot cache, evicting the least recently used."""
+        self._hot_cache[email_id] = analysis
+        self._hot_cache.move_to_end(email_id)
+        if len(self._hot_cache) > self._hot_cap:
+            self._hot_cache.popitem(last=False)
+    
+    def _cached_result(self, email_id: str, subject: str, cached_result: Dict) -> Dict:
+        """Result for an email that was already processed."""
+        self._log_history('email_cache_hit', {
             'email_id': email_id,
-            'subject': email.get('subject', 'Unknown')
+            'subject': subject or 'Unknown'
         })
-        
-        # Perform analysis
-        classification = self.classify_email_priority(
-            subject=email.get('subject', ''),
-            sender=email.get('from', ''),
-            body=email.get('body', '')
-        )
-        
-        action_items_result = self.extract_action_items(
-            subject=email.get('subject', ''),
-            body=email.get('body', '')
-        )
-        
-        meeting_requests_result = self.extract_meeting_requests(
-            subject=email.get('subject', ''),
-            body=email.get('body', '')
-        )
+        return {
+            **cached_result,
+            'from_cache': True,
+            'email_id': email_id
+        }
+    
+    def _log_processing_start(self, email_id: str, subject: str):
+        """Record that an uncached email is about to be analyzed."""
+        self._log_history('email_processing_start', {
+            'email_id': email_id,
+            'subject': subject or 'Unknown'
+        })
+    
+    def _store_result(self, email_id: str, subject: str, sender: str,
+                      timestamp: str, analysis: Dict) -> Dict:
+        """Build the result for a freshly analyzed email and cache it in the session."""
+        classification = analysis['classification']
+        action_items_result = analysis['action_items']
+        meeting_requests_result = analysis['meeting_requests']
         
         # Build result
         analysis_result = {
             'email_id': email_id,
-            'subject': email.get('subject', ''),
-            'from': email.get('from', ''),
-            'timestamp': email.get('timestamp', ''),
+            'subject': subject,
+            'from': sender,
+            'timestamp': timestamp,
             'classification': classification,
             'action_items': action_items_result.get('action_items', []),
             'meeting_requests': meeting_requests_result,
@@ -159,18 +294,17 @@ class StatefulEmailAgent:
             'processed_at': self.session_manager.session_data.get('last_updated')
         }
         
-        # Mark as processed and cache result
-        self.session_manager.mark_email_processed(email_id, analysis_result)
-        
-        # Also cache using a cache key
-        cache_key = f"email_analysis_{email_id}"
-        self.session_manager.cache_result(
-            cache_key,
-            analysis_result,
-            metadata={'type': 'email_analysis', 'email_id': email_id}
-        )
+        # Mark as processed - this is the only stored copy; the
+        # email_analysis_<id> cache key still resolves to it. Memory only:
+        # the history entry goes through the writer, which owns the save
+        self.session_manager.mark_email_processed(email_id, analysis_result, log_history=False)
+        self._remember(email_id, analysis_result)
         
-        self.session_manager.add_to_history('email_processing_complete', {
+        self._log_history('email_processed', {
+            'email_id': email_id,
+            'subject': subject or 'Unknown'
+        })
+        self._log_history('email_processing_complete', {
             'email_id': email_id,
             'priority': classification.get('priority', 'unknown'),
             'action_items_count': len(analysis_result['action_items'])
@@ -182,43 +316,158 @@ class StatefulEmailAgent:
         """
         Process multiple emails, using cache where available.
         
+        Duplicates in the batch (same email_id) are analyzed once and share
+        the result. The session file is written once for the whole batch
+        rather than several times per email.
+        
         Args:
             emails: List of email dictionaries
         
         Returns:
-            List of analysis results
+            List of analysis results (same order as emails)
         """
-        results = []
+        results: List[Dict] = [None] * len(emails)
+        groups = self._group_by_email_id(emails)
         cached_count = 0
         processed_count = 0
         
-        for email in emails:
-            result = self.process_email(email)
-            results.append(result)
+        with self.session_manager.deferred_saves():
+            for indices in groups.values():
+                result = self.process_email(emails[indices[0]])
+                results[indices[0]] = result
+                
+                if result.get('from_cache'):
+                    cached_count += 1
+                else:
+                    processed_count += 1
             
-            if result.get('from_cache'):
-                cached_count += 1
-            else:
-                processed_count += 1
+            self._fill_duplicates(results, groups)
+            
+            self._log_history('batch_processing_complete', {
+                'total_emails': len(emails),
+                'cached': cached_count,
+                'processed': processed_count,
+                'duplicates': len(emails) - len(groups)
+            })
+            # in the session before the batch's single save
+            self.flush_history()
         
-        self.session_manager.add_to_history('batch_processing_complete', {
-            'total_emails': len(emails),
-            'cached': cached_count,
-            'processed': processed_count
-        })
+        return results
+    
+    async def process_emails_async(self, emails: List[Dict], max_concurrency: int = 8) -> List[Dict]:
+        """
+        Process multiple emails concurrently, using cache where available.
+        
+        Cached emails are answered up front without any waiting. Uncached
+        ones are analyzed in worker threads, at most max_concurrency at a
+        time. Session updates all happen on the event loop thread, so the
+        session is never modified from two places at once. Duplicates in
+        the batch are analyzed once, like in process_emails.
+        
+        Uncached emails are bucketed by approximate token length and the
+        longest bucket is started first, so a few long threads don't end
+        up as stragglers after all the short notifications are done.
+        
+        Args:
+            emails: List of email dictionaries
+            max_concurrency: Maximum number of emails analyzed at once
+        
+        Returns:
+            List of analysis results (same order as emails)
+        """
+        results: List[Dict] = [None] * len(emails)
+        groups = self._group_by_email_id(emails)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def analyze_and_store(index, email_id, subject, sender, body, timestamp):
+            # analysis doesn't touch the session, so it can leave the loop
+            async with semaphore:
+                analysis = await asyncio.to_thread(self.analyze_email, subject, sender, body)
+            results[index] = self._store_result(email_id, subject, sender, timestamp, analysis)
+        
+        with self.session_manager.deferred_saves():
+            buckets = [[] for _ in EMAIL_BUCKET_LABELS]
+            for email_id, indices in groups.items():
+                index = indices[0]
+                subject, sender, body, timestamp = _email_fields(emails[index])
+                cached_analysis = self._lookup_analysis(email_id)
+                if cached_analysis is not None:
+                    results[index] = self._cached_result(email_id, subject, cached_analysis)
+                else:
+                    self._log_processing_start(email_id, subject)
+                    buckets[_token_bucket(subject, body)].append(
+                        (index, email_id, subject, sender, body, timestamp)
+                    )
+            
+            # semaphore waiters are released in order, so longest go first
+            pending = [analyze_and_store(*args) for bucket in reversed(buckets) for args in bucket]
+            await asyncio.gather(*pending)
+            self._fill_duplicates(results, groups)
+            
+            self._log_history('batch_processing_complete', {
+                'total_emails': len(emails),
+                'cached': len(groups) - len(pending),
+                'processed': len(pending),
+                'duplicates': len(emails) - len(groups),
+                'length_buckets': {
+                    label: len(bucket) for label, bucket in zip(EMAIL_BUCKET_LABELS, buckets)
+                }
+            })
+            # in the session before the batch's single save
+            self.flush_history()
         
         return results
     
+    def _group_by_email_id(self, emails: List[Dict]) -> Dict[str, List[int]]:
+        """Map each distinct email_id to the batch positions it appears at (first seen first)."""
+        groups: Dict[str, List[int]] = {}
+        for index, email in enumerate(emails):
+            email_id = self.session_manager.generate_email_id(email)
+            groups.setdefault(email_id, []).append(index)
+        return groups
+    
+    @staticmethod
+    def _fill_duplicates(results: List[Dict], groups: Dict[str, List[int]]):
+        """Give repeat emails a copy of their first occurrence's result, marked as cached."""
+        for indices in groups.values():
+            first = results[indices[0]]
+            for index in indices[1:]:
+                results[index] = {**first, 'from_cache': True}
+    
+    def clear_session(self, keep_cache: bool = True):
+        """
+        Reset per-run session state so the agent can be reused for another run.
+        
+        Args:
+            keep_cache: If True, keep processed emails and cached analyses so
+                the next run is served from cache. If False, forget them too.
+        """
+        # queued entries belong to the run being cleared
+        self.flush_history()
+        
+        session_data = self.session_manager.session_data
+        session_data['history'] = []
+        if not keep_cache:
+            session_data['processed_emails'] = {}
+            session_data['cache'] = {}
+            self._hot_cache.clear()
+        
+        self.session_manager.add_to_history('session_cleared', {
+            'keep_cache': keep_cache
+        })
+    
     def get_processed_emails(self) -> Dict:
         """Get all processed emails."""
         return self.session_manager.session_data.get('processed_emails', {})
     
     def get_processing_history(self, limit: int = None) -> List[Dict]:
         """Get processing history."""
+        self.flush_history()
         return self.session_manager.get_history(limit=limit)
     
     def get_stats(self) -> Dict:
         """Get agent statistics."""
+        self.flush_history()
         stats = self.session_manager.get_session_stats()
         processed = self.get_processed_emails()
         
@@ -0,0 +1,29 @@
+"""
+Agent instruction prompts.
+
+Prompts live as .md files in this directory instead of as long strings in
+the agent modules, so they're only read when an agent is actually built.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+
+INSTRUCTIONS_DIR = Path(__file__).parent
+
+
+@lru_cache(maxsize=None)
+def load_instruction(name: str) -> str:
+    """
+    Load an agent instruction prompt, reading the file only once.
+    
+    Args:
+        name: Prompt file name without extension (e.g. 'email_agent')
+    
+    Returns:
+        Prompt text
+    """
+    return (INSTRUCTIONS_DIR / f"{name}.md").read_text(encoding='utf-8')
+
+
+__all__ = ['load_instruction']
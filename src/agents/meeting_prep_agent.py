@@ -3,81 +3,110 @@ Meeting prep - pulls context from past meetings and participant info
 The participant research is still mostly fake until we wire up LinkedIn
 """
 
-from google import genai
-from google.genai import types
+import asyncio
 import sys
 import os
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# only needed when run directly as a script - as part of the agents
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import meeting_prep_tools
-from services.weather_service import WeatherService
+from agents.instructions import load_instruction
+from agents.clients import get_genai_client, with_service_tier
+from agents.response_cache import ResponseCache, normalize_text, normalize_people
+
+
+MODEL = 'gemini-2.0-flash-exp'
+
+_MEETING_PREP_TOOLS = (
+    meeting_prep_tools.search_past_meetings,
+    meeting_prep_tools.research_participants,
+    meeting_prep_tools.generate_meeting_briefing,
+)
+
+# fixed briefing prompt, built once - only the meeting's fields are filled in
+_BRIEFING_TEMPLATE = """Prepare briefing for:
+
+Meeting: %(subject)s
+Date: %(date)s
+Duration: %(duration)s min
+Attendees: %(attendees)s
+Location: %(location)s
+%(description)s
+Steps:
+1. Search past meetings (last %(history_days)s days)
+2. Research participants
+3. Generate briefing with:
+   - Summary
+   - Objective
+   - Participants (with context)
+   - History
+   - Open items
+   - Talking points
+   - Prep checklist
+   - Quality score
+
+Make it actionable.
+"""
+
+# recent briefings - re-prepping the same meeting within the hour reuses one
+_briefing_cache = ResponseCache(ttl_seconds=3600)
+
+# (subject, attendees) -> (past_meetings, participant_info); prepping a
+# meeting and then checking its readiness looks the same things up twice
+_context_cache = ResponseCache(ttl_seconds=900, max_entries=1024)
+
+# runs search_past_meetings while the caller researches participants -
+# the two lookups don't depend on each other
+_context_pool = None
+# runs the fallback's lookups alongside the agent call; small and separate
+# from _context_pool, which the lookups themselves wait on
+_prefetch_pool = None
+
+# built once on first use and shared by every briefing
+_meeting_prep_agent = None
 
 
 def create_meeting_prep_agent():
-    """Setup meeting prep agent"""
+    """
+    Setup meeting prep agent (cached after the first call)
     
-    client = genai.Client()
+    Thinking is left at the model's default - unlike email triage, a
+    briefing pulls history, people and agenda together and benefits from
+    the reasoning, so the extra latency is worth it here.
+    """
+    global _meeting_prep_agent
+    if _meeting_prep_agent is not None:
+        return _meeting_prep_agent
     
-    tools = [
-        meeting_prep_tools.search_past_meetings,
-        meeting_prep_tools.research_participants,
-        meeting_prep_tools.generate_meeting_briefing
-    ]
-    
-    # Initialize weather service
-    weather_service = WeatherService()
-    
-    instruction = """You prep executives for meetings. Make it fast and useful.
-
-What to do:
-1. Search past meetings for context
-2. Research participants (roles, styles)
-3. Generate briefing with key points
-4. Include weather context for meeting planning
-
-Include weather context for meeting planning:
-- Suggest indoor/outdoor venues based on weather
-- Recommend virtual option if weather is severe
-- Consider commute impact in bad weather
-- Factor in temperature for comfort
-
-Briefing format:
-- Summary (2-3 lines max)
-- Objective (what are we deciding)
-- Participants (who matters, what they want)
-- History (past decisions, open items)
-- Weather context (if relevant for venue/commute)
-- Talking points (3-5 specific things)
-- Prep tasks (what to do before)
-- Quality score (how good is this briefing)
-
-Keep it under 600 words. Be specific, not generic.
-First meetings: focus on intros
-Decision meetings: have data ready
-Client meetings: know the account
-Team meetings: know blockers
-
-Flag sensitive stuff. No fluff.
-"""
+    # SDK imported here so importing this module stays cheap
+    from google.genai import types
+    
+    client = get_genai_client()
     
     agent_config = types.GenerateContentConfig(
-        system_instruction=instruction,
-        tools=tools,
+        system_instruction=load_instruction('meeting_prep_agent'),
+        tools=list(_MEETING_PREP_TOOLS),
         temperature=0.5,
         top_p=0.9,
         top_k=40,
     )
     
-    return client, agent_config
+    _meeting_prep_agent = (client, agent_config)
+    return _meeting_prep_agent
 
 
 def prepare_meeting_briefing(
     meeting_details: Dict,
     include_detailed_history: bool = True,
-    research_participants_deeply: bool = True
+    research_participants_deeply: bool = True,
+    service_tier: str = 'priority'
 ) -> str:
     """
     Generate briefing for upcoming meeting
@@ -86,76 +115,143 @@ def prepare_meeting_briefing(
         meeting_details: Dict with subject, date, duration, attendees, etc
         include_detailed_history: Search back 90 days vs 30
         research_participants_deeply: Deep dive on participants (not really working yet)
+        service_tier: 'priority' (default - someone is waiting on this),
+            'standard', or 'flex' for briefings prepared ahead of time
             
     Returns:
         Briefing text
     """
+    cache_key = _briefing_cache_key(meeting_details, include_detailed_history)
+    cached = _briefing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    context = _prefetch_meeting_context(meeting_details)
     client, config = create_meeting_prep_agent()
+    query = _briefing_query(meeting_details, include_detailed_history)
     
-    subject = meeting_details.get('subject', 'Untitled')
-    date = meeting_details.get('date', 'TBD')
-    duration = meeting_details.get('duration_minutes', 60)
-    attendees = meeting_details.get('attendees', [])
-    description = meeting_details.get('description', '')
-    location = meeting_details.get('location', 'Not specified')
+    try:
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=query,
+            config=with_service_tier(config, service_tier)
+        )
+        
+        _briefing_cache.put(cache_key, response.text)
+        return response.text
     
-    attendees_list = ", ".join(attendees)
+    except Exception as e:
+        print(f"Agent failed: {e}")
+        return _generate_briefing_fallback(meeting_details, context)
     
-    query = f"""Prepare briefing for:
+    finally:
+        # lookups still queued aren't needed once the agent has answered
+        context.cancel()
 
-Meeting: {subject}
-Date: {date}
-Duration: {duration} min
-Attendees: {attendees_list}
-Location: {location}
-"""
+
+def prepare_meeting_briefing_stream(
+    meeting_details: Dict,
+    include_detailed_history: bool = True,
+    research_participants_deeply: bool = True,
+    service_tier: str = 'priority'
+) -> Iterator[str]:
+    """
+    Same as prepare_meeting_briefing but yields the briefing as it's generated
     
-    if description:
-        query += f"Description: {description}\n"
+    Args:
+        meeting_details: Dict with subject, date, duration, attendees, etc
+        include_detailed_history: Search back 90 days vs 30
+        research_participants_deeply: Deep dive on participants (not really working yet)
+        service_tier: 'priority', 'standard' or 'flex' (see prepare_meeting_briefing)
     
-    query += f"""
-Steps:
-1. Search past meetings (last {'90' if include_detailed_history else '30'} days)
-2. Research participants
-3. Generate briefing with:
-   - Summary
-   - Objective
-   - Participants (with context)
-   - History
-   - Open items
-   - Talking points
-   - Prep checklist
-   - Quality score
-
-Make it actionable.
-"""
+    Yields:
+        Chunks of briefing text - the first shows up after ~1 round trip
+        instead of after the whole briefing is written
+    """
+    cache_key = _briefing_cache_key(meeting_details, include_detailed_history)
+    cached = _briefing_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
     
+    context = _prefetch_meeting_context(meeting_details)
+    client, config = create_meeting_prep_agent()
+    query = _briefing_query(meeting_details, include_detailed_history)
+    
+    started = False
+    parts = []
     try:
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
+        for chunk in client.models.generate_content_stream(
+            model=MODEL,
             contents=query,
-            config=config
-        )
-        
-        return response.text
+            config=with_service_tier(config, service_tier)
+        ):
+            if chunk.text:
+                started = True
+                parts.append(chunk.text)
+                yield chunk.text
         
+        # only a briefing that streamed all the way through is reused
+        _briefing_cache.put(cache_key, "".join(parts))
+    
     except Exception as e:
         print(f"Agent failed: {e}")
-        return _generate_briefing_fallback(meeting_details)
+        # only fall back if nothing was shown yet - otherwise the caller
+        # would get half a briefing followed by a different whole one
+        if not started:
+            yield _generate_briefing_fallback(meeting_details, context)
+    
+    finally:
+        context.cancel()
 
 
-def _generate_briefing_fallback(meeting_details: Dict) -> str:
-    """Direct tool usage if agent fails"""
-    
-    # call tools directly
-    past_meetings = meeting_prep_tools.search_past_meetings(
-        meeting_subject=meeting_details.get('subject', ''),
-        participants=meeting_details.get('attendees', [])
+def _briefing_cache_key(meeting_details: Dict, include_detailed_history: bool):
+    """Everything that goes into the briefing prompt, normalised"""
+    get = meeting_details.get
+    return (
+        'briefing',
+        normalize_text(get('subject', 'Untitled')),
+        normalize_text(get('date', 'TBD')),
+        get('duration_minutes', 60),
+        normalize_people(get('attendees') or []),
+        normalize_text(get('description', '')),
+        normalize_text(get('location', 'Not specified')),
+        include_detailed_history,
     )
+
+
+def _briefing_query(meeting_details: Dict, include_detailed_history: bool) -> str:
+    """Prompt for one meeting's briefing"""
+    get = meeting_details.get
+    description = get('description', '')
+    
+    return _BRIEFING_TEMPLATE % {
+        'subject': get('subject', 'Untitled'),
+        'date': get('date', 'TBD'),
+        'duration': get('duration_minutes', 60),
+        'attendees': ", ".join(get('attendees', [])),
+        'location': get('location', 'Not specified'),
+        'description': f"Description: {description}\n" if description else "",
+        'history_days': '90' if include_detailed_history else '30',
+    }
+
+
+def _generate_briefing_fallback(meeting_details: Dict, context: Optional[Future] = None) -> str:
+    """
+    Direct tool usage if agent fails
     
-    participant_info = meeting_prep_tools.research_participants(
-        participants=meeting_details.get('attendees', [])
-    )
+    context is the lookup started by _prefetch_meeting_context, if any -
+    usually done by the time the agent has failed.
+    """
+    
+    # call tools directly
+    if context is not None:
+        past_meetings, participant_info = context.result()
+    else:
+        past_meetings, participant_info = _meeting_context(
+            meeting_details.get('subject') or '',
+            meeting_details.get('attendees') or []
+        )
     
     briefing = meeting_prep_tools.generate_meeting_briefing(
         meeting_details=meeting_details,
@@ -163,8 +259,8 @@ def _generate_briefing_fallback(meeting_details: Dict) -> str:
         participant_info=participant_info
     )
     
-    # format output
-    output = f"""# {briefing['meeting_title']}
+    # format output - collect the pieces and join once at the end
+    parts = [f"""# {briefing['meeting_title']}
 
 **Date**: {briefing['meeting_date']} ({briefing['duration']})
 **Attendees**: {briefing['attendees_count']}
@@ -176,53 +272,156 @@ def _generate_briefing_fallback(meeting_details: Dict) -> str:
 {briefing['meeting_objective']}
 
 ## Participants
-"""
+"""]
     
     for p in briefing['key_participants']:
-        output += f"\n**{p['name']}** - {p['title']}\n"
-        output += f"- Role: {p['role']}\n"
-        output += f"- Note: {p['prep_note']}\n"
+        parts.append(f"\n**{p['name']}** - {p['title']}\n")
+        parts.append(f"- Role: {p['role']}\n")
+        parts.append(f"- Note: {p['prep_note']}\n")
     
-    output += "\n## History\n"
+    parts.append("\n## History\n")
     for h in briefing['relevant_history']:
-        output += f"\n**{h['date']}**: {h['summary']}\n"
+        parts.append(f"\n**{h['date']}**: {h['summary']}\n")
         if h['key_decisions']:
-            output += "- Decisions: " + "; ".join(h['key_decisions']) + "\n"
+            parts.append("- Decisions: " + "; ".join(h['key_decisions']) + "\n")
     
     if briefing['open_action_items']:
-        output += "\n## Open Items\n"
+        parts.append("\n## Open Items\n")
         for item in briefing['open_action_items']:
-            output += f"- {item}\n"
+            parts.append(f"- {item}\n")
     
-    output += "\n## Talking Points\n"
+    parts.append("\n## Talking Points\n")
     for i, point in enumerate(briefing['suggested_talking_points'], 1):
-        output += f"{i}. {point}\n"
+        parts.append(f"{i}. {point}\n")
     
-    output += "\n## Prep Checklist\n"
+    parts.append("\n## Prep Checklist\n")
     for i, item in enumerate(briefing['preparation_checklist'], 1):
-        output += f"{i}. {item}\n"
+        parts.append(f"{i}. {item}\n")
     
-    output += f"\n**Quality**: {briefing['briefing_quality_score']:.0f}/100\n"
+    parts.append(f"\n**Quality**: {briefing['briefing_quality_score']:.0f}/100\n")
     
-    return output
+    return "".join(parts)
 
 
-def analyze_meeting_readiness(meeting_details: Dict) -> Dict:
+def _meeting_context(subject: str, attendees: List[str], refresh: bool = False):
     """
-    Check how ready you are for a meeting
+    Past meetings and participant research, looked up side by side
+    
+    Results are reused for 15 minutes; refresh=True looks them up again.
+    The returned dicts are shared with the cache, so don't modify them.
+    
+    Returns:
+        (past_meetings, participant_info)
+    """
+    global _context_pool
+    
+    key = (subject, tuple(attendees))
+    if not refresh:
+        cached = _context_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    if _context_pool is None:
+        _context_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="meeting-context")
+    
+    past_future = _context_pool.submit(
+        meeting_prep_tools.search_past_meetings,
+        meeting_subject=subject,
+        participants=attendees
+    )
+    participant_info = meeting_prep_tools.research_participants(participants=attendees)
     
-    Returns readiness score and recommendations
+    context = (past_future.result(), participant_info)
+    _context_cache.put(key, context)
+    return context
+
+
+def _prefetch_meeting_context(meeting_details: Dict) -> Future:
     """
+    Start the fallback's lookups while the agent works on the briefing
     
-    # get context
-    past_meetings = meeting_prep_tools.search_past_meetings(
-        meeting_subject=meeting_details.get('subject', ''),
-        participants=meeting_details.get('attendees', [])
+    If the agent fails the fallback only has to assemble the briefing
+    instead of doing the lookups too. Runs on a two-thread pool, so a
+    burst of briefings queues lookups rather than starting a thread each;
+    callers cancel the future once the agent answers, which drops it if
+    it hasn't started (a lookup already running still fills the cache for
+    a follow-up readiness check).
+    
+    Returns:
+        Future for (past_meetings, participant_info)
+    """
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        _prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="meeting-context-prefetch")
+    
+    return _prefetch_pool.submit(
+        _meeting_context,
+        meeting_details.get('subject') or '',
+        meeting_details.get('attendees') or []
     )
+
+
+async def _meeting_context_async(subject: str, attendees: List[str], refresh: bool = False):
+    """Same as _meeting_context but awaitable - both lookups run in threads"""
+    key = (subject, tuple(attendees))
+    if not refresh:
+        cached = _context_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    context = tuple(await asyncio.gather(
+        asyncio.to_thread(
+            meeting_prep_tools.search_past_meetings,
+            meeting_subject=subject,
+            participants=attendees
+        ),
+        asyncio.to_thread(meeting_prep_tools.research_participants, participants=attendees)
+    ))
+    _context_cache.put(key, context)
+    return context
+
+
+def analyze_meeting_readiness(meeting_details: Dict, refresh: bool = False) -> Dict:
+    """
+    Check how ready you are for a meeting
     
-    participant_info = meeting_prep_tools.research_participants(
-        participants=meeting_details.get('attendees', [])
+    Returns readiness score and recommendations. Past meetings and
+    participant info looked up in the last 15 minutes (e.g. for the
+    briefing) are reused unless refresh=True.
+    """
+    past_meetings, participant_info = _meeting_context(
+        meeting_details.get('subject') or '',
+        meeting_details.get('attendees') or [],
+        refresh
     )
+    return _score_readiness(meeting_details, past_meetings, participant_info)
+
+
+async def analyze_meeting_readiness_async(meeting_details: Dict, refresh: bool = False) -> Dict:
+    """
+    Same as analyze_meeting_readiness but doesn't block the event loop
+    
+    Args:
+        meeting_details: Meeting dict (subject, date, attendees, ...)
+        refresh: Look past meetings / participants up again instead of
+            reusing a recent lookup
+    
+    Returns:
+        Readiness score and recommendations
+    """
+    past_meetings, participant_info = await _meeting_context_async(
+        meeting_details.get('subject') or '',
+        meeting_details.get('attendees') or [],
+        refresh
+    )
+    return _score_readiness(meeting_details, past_meetings, participant_info)
+
+
+def _score_readiness(meeting_details: Dict, past_meetings: Dict, participant_info: Dict) -> Dict:
+    """Turn the looked-up context into a readiness score + recommendations"""
+    attendee_count = len(meeting_details.get('attendees') or [])
+    description = meeting_details.get('description')
+    date = meeting_details.get('date')
     
     # score factors
     readiness_score = 0.0
@@ -246,21 +445,21 @@ def analyze_meeting_readiness(meeting_details: Dict) -> Dict:
     
     # new people (risk)
     new_participants = participant_info.get('new_participants', [])
-    if new_participants:
-        risk_score = -min(len(new_participants) * 5, 10)
+    new_count = len(new_participants)
+    if new_count:
+        risk_score = -min(new_count * 5, 10)
         readiness_score += risk_score
-        factors.append(f"New people: {len(new_participants)} ({risk_score})")
+        factors.append(f"New people: {new_count} ({risk_score})")
     
     # other factors
-    if meeting_details.get('date') != 'TBD':
+    if date != 'TBD':
         readiness_score += 5
         factors.append("Scheduled (+5)")
     
-    if meeting_details.get('description'):
+    if description:
         readiness_score += 10
         factors.append("Has agenda (+10)")
     
-    attendee_count = len(meeting_details.get('attendees', []))
     if 2 <= attendee_count <= 10:
         readiness_score += 5
         factors.append(f"Good size: {attendee_count} (+5)")
@@ -273,8 +472,8 @@ def analyze_meeting_readiness(meeting_details: Dict) -> Dict:
         recommendations.append("Low readiness - need 30-60 min prep")
     if meetings_found == 0:
         recommendations.append("Check emails for context")
-    if new_participants:
-        recommendations.append(f"Research {len(new_participants)} new people")
+    if new_count:
+        recommendations.append(f"Research {new_count} new people")
     if readiness_score >= 75:
         recommendations.append("Well prepared - quick review is fine")
     
@@ -286,32 +485,25 @@ def analyze_meeting_readiness(meeting_details: Dict) -> Dict:
         'prep_time_estimate': _estimate_prep_time(readiness_score),
         'past_meetings_found': meetings_found,
         'participants_researched': participants_researched,
-        'new_participants_count': len(new_participants)
+        'new_participants_count': new_count
     }
 
 
+# score thresholds (lowest first) and the label for each band - a score
+# at a threshold belongs to the band above it
+_LEVEL_THRESHOLDS = (35, 50, 65, 80)
+_LEVEL_LABELS = ("INSUFFICIENT", "LOW", "FAIR", "GOOD", "EXCELLENT")
+
+_PREP_TIME_THRESHOLDS = (50, 65, 80)
+_PREP_TIME_LABELS = ("45-60 min", "30-45 min", "20-30 min", "10-15 min")
+
+
 def _get_readiness_level(score: float) -> str:
-    if score >= 80:
-        return "EXCELLENT"
-    elif score >= 65:
-        return "GOOD"
-    elif score >= 50:
-        return "FAIR"
-    elif score >= 35:
-        return "LOW"
-    else:
-        return "INSUFFICIENT"
+    return _LEVEL_LABELS[bisect_right(_LEVEL_THRESHOLDS, score)]
 
 
 def _estimate_prep_time(score: float) -> str:
-    if score >= 80:
-        return "10-15 min"
-    elif score >= 65:
-        return "20-30 min"
-    elif score >= 50:
-        return "30-45 min"
-    else:
-        return "45-60 min"
+    return _PREP_TIME_LABELS[bisect_right(_PREP_TIME_THRESHOLDS, score)]
 
 
 if __name__ == "__main__":
@@ -335,8 +527,10 @@ if __name__ == "__main__":
     print("-" * 40)
     
     try:
-        briefing = prepare_meeting_briefing(test_meeting)
-        print(briefing)
+        # stream so the briefing shows up as it's written
+        for text in prepare_meeting_briefing_stream(test_meeting):
+            print(text, end='', flush=True)
+        print()
         
         print("\nReadiness check:")
         readiness = analyze_meeting_readiness(test_meeting)
@@ -0,0 +1,75 @@
+"""
+Short-lived cache of model answers for repeated requests.
+
+Executives re-prep the same recurring meetings and re-ask for the same
+slots; when the request is the same after normalising (case, spacing,
+attendee order) the earlier answer is returned instead of calling Gemini
+again.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+
+def normalize_text(text) -> str:
+    """Lower-case and collapse whitespace so trivially different inputs match"""
+    return " ".join(str(text or "").lower().split())
+
+
+def normalize_people(people: Iterable[str]) -> Tuple[str, ...]:
+    """Attendee list as a sorted tuple - order doesn't change the answer"""
+    return tuple(sorted(normalize_text(person) for person in people or ()))
+
+
+class ResponseCache:
+    """
+    LRU of responses whose entries expire after a fixed time.
+    
+    Keys are tuples built by the caller from the normalised request fields
+    (function name first, so different calls never share an answer).
+    Values are usually response texts, but any non-empty value works.
+    """
+    
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 256):
+        """
+        Args:
+            ttl_seconds: How long an answer may be reused
+            max_entries: Least recently used answers are dropped past this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Tuple, value: Any):
+        """Store an answer, evicting the least recently used past the limit"""
+        if not value:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
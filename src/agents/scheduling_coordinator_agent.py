@@ -3,56 +3,100 @@ Scheduling agent - finds meeting times that work for everyone
 Still need to add timezone handling properly
 """
 
-from google import genai
-from google.genai import types
 import sys
 import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# only needed when run directly as a script - as part of the agents
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import scheduling_tools
+from agents.instructions import load_instruction
+from agents.clients import get_genai_client, with_service_tier
+from agents.response_cache import ResponseCache, normalize_text, normalize_people
 
 
-def create_scheduling_agent():
-    """Setup scheduling agent"""
-    
-    client = genai.Client()
+MODEL = 'gemini-2.0-flash-exp'
+
+_SCHEDULING_TOOLS = (
+    scheduling_tools.check_availability,
+    scheduling_tools.find_optimal_time,
+    scheduling_tools.send_meeting_invitation,
+    scheduling_tools.check_scheduling_conflicts,
+)
+
+# availability moves quickly, so suggested slots are only reused briefly.
+# reschedule_meeting isn't cached - it notifies people and edits calendars.
+_scheduling_cache = ResponseCache(ttl_seconds=300)
+
+# fixed prompt text, built once - only the request's fields are filled in per call
+_FIND_TIME_TEMPLATE = """Find meeting time for:
+    Participants: %(participants)s
+    Duration: %(duration)s minutes
+    Urgency: %(urgency)s
+    %(preferences)s
+    Steps:
+    1. Check availability for all
+    2. Find 3 best slots
+    3. Score each (0-1)
+    4. Check conflicts
+    5. Rank by quality
     
-    tools = [
-        scheduling_tools.check_availability,
-        scheduling_tools.find_optimal_time,
-        scheduling_tools.send_meeting_invitation,
-        scheduling_tools.check_scheduling_conflicts
-    ]
+    Return top 3 with reasoning.
+    """
+
+_RESCHEDULE_TEMPLATE = """Reschedule meeting %(meeting_id)s
+    Reason: %(reason)s
+    %(constraints)s
+    1. Check original details
+    2. Find new times
+    3. Notify participants
+    4. Update calendar
+    """
+
+_CONFLICT_TEMPLATE = """%s
     
-    instruction = """You coordinate meeting schedules.
+    Resolve by:
+    1. Identify priority meeting
+    2. Find alternatives for others
+    3. Suggest resolution
+    """
 
-Process:
-1. Check everyone's availability
-2. Find times that work (quality score 0-1)
-3. Check for conflicts
-4. Send invites
+_BATCH_TEMPLATE = """%s
+    
+    Optimize for:
+    1. Minimal calendar fragmentation
+    2. Group similar meetings
+    3. Protect focus time
+    4. Avoid back-to-back
+    
+    Schedule all efficiently.
+    """
 
-Good times (0.75+): Morning, everyone free
-OK times (0.6-0.74): Some compromises
-Bad times (<0.6): Avoid unless urgent
+# built once on first use and shared by every request
+_scheduling_agent = None
 
-Rules:
-- No early/late meetings (before 9am, after 6pm)
-- Give 2-3 options
-- Flag conflicts
-- 15min buffer between meetings preferred
 
-Keep it simple and clear.
-"""
+def create_scheduling_agent():
+    """Setup scheduling agent (cached after the first call)"""
+    global _scheduling_agent
+    if _scheduling_agent is not None:
+        return _scheduling_agent
+    
+    # SDK imported here so importing this module stays cheap
+    from google.genai import types
+    
+    client = get_genai_client()
     
     agent_config = types.GenerateContentConfig(
-        system_instruction=instruction,
-        tools=tools,
+        system_instruction=load_instruction('scheduling_agent'),
+        tools=list(_SCHEDULING_TOOLS),
         temperature=0.2,  # consistent scheduling
     )
     
-    return client, agent_config
+    _scheduling_agent = (client, agent_config)
+    return _scheduling_agent
 
 
 def find_meeting_time(
@@ -73,38 +117,89 @@ def find_meeting_time(
     Returns:
         Top 3 time slots with scores
     """
+    if not participants:
+        return "No participants specified"
+    
+    cache_key = _find_time_cache_key(participants, duration_minutes, preferred_times, urgency)
+    cached = _scheduling_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     client, config = create_scheduling_agent()
     
-    participants_list = ", ".join(participants)
+    response = client.models.generate_content(
+        model=MODEL,
+        contents=_find_time_query(participants, duration_minutes, preferred_times, urgency),
+        config=config
+    )
     
-    query = f"""Find meeting time for:
-    Participants: {participants_list}
-    Duration: {duration_minutes} minutes
-    Urgency: {urgency}
+    _scheduling_cache.put(cache_key, response.text)
+    return response.text
+
+
+def find_meeting_time_stream(
+    participants,
+    duration_minutes=60,
+    preferred_times=None,
+    urgency="normal"
+):
     """
+    Same as find_meeting_time but yields the answer as it's generated
     
-    if preferred_times:
-        query += f"Preferences: {preferred_times}\n"
-    
-    query += """
-    Steps:
-    1. Check availability for all
-    2. Find 3 best slots
-    3. Score each (0-1)
-    4. Check conflicts
-    5. Rank by quality
+    Args:
+        participants: List of emails
+        duration_minutes: Meeting length
+        preferred_times: Optional preferences
+        urgency: normal/high/low
     
-    Return top 3 with reasoning.
+    Yields:
+        Chunks of the suggested slots text
     """
+    if not participants:
+        yield "No participants specified"
+        return
     
-    response = client.models.generate_content(
-        model='gemini-2.0-flash-exp',
-        contents=query,
+    cache_key = _find_time_cache_key(participants, duration_minutes, preferred_times, urgency)
+    cached = _scheduling_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    client, config = create_scheduling_agent()
+    
+    parts = []
+    for chunk in client.models.generate_content_stream(
+        model=MODEL,
+        contents=_find_time_query(participants, duration_minutes, preferred_times, urgency),
         config=config
-    )
+    ):
+        if chunk.text:
+            parts.append(chunk.text)
+            yield chunk.text
     
-    return response.text
+    # only an answer that streamed all the way through is reused
+    _scheduling_cache.put(cache_key, "".join(parts))
+
+
+def _find_time_cache_key(participants, duration_minutes, preferred_times, urgency):
+    """Normalised find_meeting_time request"""
+    return (
+        'find_meeting_time',
+        normalize_people(participants),
+        duration_minutes,
+        normalize_text(preferred_times),
+        normalize_text(urgency),
+    )
+
+
+def _find_time_query(participants, duration_minutes, preferred_times, urgency):
+    """Prompt for finding a meeting slot"""
+    return _FIND_TIME_TEMPLATE % {
+        'participants': ", ".join(participants),
+        'duration': duration_minutes,
+        'urgency': urgency,
+        'preferences': f"Preferences: {preferred_times}\n" if preferred_times else "",
+    }
 
 
 def reschedule_meeting(
@@ -117,25 +212,19 @@ def reschedule_meeting(
     
     Handles conflicts or changes
     """
+    if not meeting_id:
+        return "No meeting specified to reschedule"
     
     client, config = create_scheduling_agent()
     
-    query = f"""Reschedule meeting {meeting_id}
-    Reason: {reason}
-    """
-    
-    if new_constraints:
-        query += f"New constraints: {new_constraints}\n"
-    
-    query += """
-    1. Check original details
-    2. Find new times
-    3. Notify participants
-    4. Update calendar
-    """
+    query = _RESCHEDULE_TEMPLATE % {
+        'meeting_id': meeting_id,
+        'reason': reason,
+        'constraints': f"New constraints: {new_constraints}\n" if new_constraints else "",
+    }
     
     response = client.models.generate_content(
-        model='gemini-2.0-flash-exp',
+        model=MODEL,
         contents=query,
         config=config
     )
@@ -149,27 +238,27 @@ def handle_scheduling_conflict(conflicts_list):
     
     Prioritize by importance
     """
+    if not conflicts_list:
+        return "No conflicts to resolve"
     
-    client, config = create_scheduling_agent()
+    cache_key = ('handle_scheduling_conflict', tuple(sorted(normalize_text(c) for c in conflicts_list)))
+    cached = _scheduling_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    conflicts_summary = "Conflicts found:\n"
-    for conflict in conflicts_list:
-        conflicts_summary += f"- {conflict}\n"
+    client, config = create_scheduling_agent()
     
-    query = f"""{conflicts_summary}
+    conflicts_summary = "Conflicts found:\n" + "".join(f"- {conflict}\n" for conflict in conflicts_list)
     
-    Resolve by:
-    1. Identify priority meeting
-    2. Find alternatives for others
-    3. Suggest resolution
-    """
+    query = _CONFLICT_TEMPLATE % conflicts_summary
     
     response = client.models.generate_content(
-        model='gemini-2.0-flash-exp',
+        model=MODEL,
         contents=query,
         config=config
     )
     
+    _scheduling_cache.put(cache_key, response.text)
     return response.text
 
 
@@ -185,27 +274,41 @@ def batch_schedule_meetings(meeting_requests):
     
     client, config = create_scheduling_agent()
     
-    requests_summary = f"Schedule {len(meeting_requests)} meetings:\n"
-    for i, req in enumerate(meeting_requests, 1):
-        requests_summary += f"{i}. {req.get('subject', 'Meeting')}"
-        requests_summary += f" ({req.get('duration', 60)}min)\n"
-        requests_summary += f"   With: {req.get('participants', 'TBD')}\n"
+    # planning a batch of meetings is offline work - the cheaper flex tier is fine
+    response = client.models.generate_content(
+        model=MODEL,
+        contents=_batch_schedule_query(meeting_requests),
+        config=with_service_tier(config, 'flex')
+    )
     
-    query = f"""{requests_summary}
+    return {
+        "scheduled_count": len(meeting_requests),
+        "scheduling_plan": response.text
+    }
+
+
+async def batch_schedule_meetings_async(meeting_requests):
+    """
+    Same as batch_schedule_meetings but awaits the model instead of blocking
     
-    Optimize for:
-    1. Minimal calendar fragmentation
-    2. Group similar meetings
-    3. Protect focus time
-    4. Avoid back-to-back
+    The meetings still go out as one request - the plan is about how they
+    fit together (grouping, fragmentation), which per-meeting calls can't see.
     
-    Schedule all efficiently.
+    Args:
+        meeting_requests: List of dicts with subject, duration, participants
+    
+    Returns:
+        Dict with scheduled_count and scheduling_plan
     """
+    if not meeting_requests:
+        return {"status": "no meetings to schedule"}
     
-    response = client.models.generate_content(
-        model='gemini-2.0-flash-exp',
-        contents=query,
-        config=config
+    client, config = create_scheduling_agent()
+    
+    response = await client.aio.models.generate_content(
+        model=MODEL,
+        contents=_batch_schedule_query(meeting_requests),
+        config=with_service_tier(config, 'flex')
     )
     
     return {
@@ -214,6 +317,18 @@ def batch_schedule_meetings(meeting_requests):
     }
 
 
+def _batch_schedule_query(meeting_requests):
+    """Prompt covering every meeting in the batch"""
+    lines = [f"Schedule {len(meeting_requests)} meetings:\n"]
+    for i, req in enumerate(meeting_requests, 1):
+        lines.append(f"{i}. {req.get('subject', 'Meeting')}")
+        lines.append(f" ({req.get('duration', 60)}min)\n")
+        lines.append(f"   With: {req.get('participants', 'TBD')}\n")
+    requests_summary = "".join(lines)
+    
+    return _BATCH_TEMPLATE % requests_summary
+
+
 if __name__ == "__main__":
     print("Scheduling Agent Test")
     print("-" * 40)
@@ -229,13 +344,15 @@ if __name__ == "__main__":
     print("Duration: 60 minutes\n")
     
     try:
-        result = find_meeting_time(
+        print("Available slots:")
+        # stream so the slots show up as they're written
+        for text in find_meeting_time_stream(
             participants=test_participants,
             duration_minutes=60,
             urgency="normal"
-        )
-        print("Available slots:")
-        print(result)
+        ):
+            print(text, end='', flush=True)
+        print()
         
         # test conflict resolution
         test_conflicts = [
@@ -4,22 +4,23 @@ Q2 (important not urgent) is where the magic happens
 """
 
 import os
+import re
+from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional
-from dotenv import load_dotenv
-import vertexai
-from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
 
-load_dotenv()
-
-vertexai.init(
-    project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-    location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-)
+# deployed workers get their env from the orchestrator - only local dev
+# (PROFLOW_USE_DOTENV=1) pays for finding and parsing a .env file
+if os.getenv('PROFLOW_USE_DOTENV'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# only needed when run directly as a script - as part of the agents
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tools.task_management_tools import (
     categorize_task_eisenhower,
     calculate_deadline_urgency,
@@ -27,69 +28,214 @@ from tools.task_management_tools import (
     suggest_task_schedule,
     batch_process_tasks
 )
+from agents.instructions import load_instruction
+from agents.clients import ensure_vertex_init
+
+
+# the agent's tools - a tuple so the set can't drift between callers
+_TASK_TOOLS = (
+    categorize_task_eisenhower,
+    calculate_deadline_urgency,
+    check_task_dependencies,
+    suggest_task_schedule,
+    batch_process_tasks,
+)
+
+# minutes assumed for a task without an estimated_duration
+DEFAULT_TASK_MINUTES = 30
+
+# built once on first use and shared by later callers
+_task_agent = None
+
+# importance of a single task read off its wording - enough for the
+# clear-cut cases to skip the model (matches add up, capped at 10)
+_HINT_WEIGHTS = {
+    'ceo': 10,
+    'board': 9,
+    'investor': 8,
+    'revenue': 8,
+    'legal': 8,
+    'client': 7,
+    'customer': 7,
+    'escalation': 7,
+    'compliance': 7,
+    'budget': 6,
+    'launch': 6,
+    'strategy': 6,
+    'performance review': 5,
+    'hiring': 5,
+}
+_HINT_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(hint) for hint in sorted(_HINT_WEIGHTS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+# words analyze_task_load sorts tasks by (one pass per task, any case)
+_LOAD_KEYWORDS = re.compile(r"urgent|important", re.IGNORECASE)
 
 
 def create_task_management_agent():
-    """Setup task agent with Eisenhower matrix"""
+    """Setup task agent with Eisenhower matrix (cached after the first call)"""
+    global _task_agent
+    if _task_agent is not None:
+        return _task_agent
+    
+    ensure_vertex_init()
+    from google.adk.agents import LlmAgent
+    from google.adk.models.google_llm import Gemini
     
-    agent = LlmAgent(
+    _task_agent = LlmAgent(
         model=Gemini(model="gemini-2.5-flash-lite"),
         name="task_management_agent",
         description="Task prioritization using Eisenhower Matrix",
-        instruction="""
-        Manage tasks for busy executives. Use Eisenhower Matrix to prioritize.
-        
-        Process:
-        1. Categorize (use categorize_task_eisenhower)
-           - Q1: Urgent + Important -> Do now
-           - Q2: Important not urgent -> Schedule (this is gold)
-           - Q3: Urgent not important -> Delegate
-           - Q4: Neither -> Drop it
-        
-        2. Score urgency (use calculate_deadline_urgency)
-           - 10: Today/overdue
-           - 8-9: Tomorrow
-           - 6-7: This week
-           - 3-5: Next week
-           - 0-2: Later
-        
-        3. Check dependencies (use check_task_dependencies)
-           - What's blocked?
-           - What blocks others?
-        
-        4. Schedule smart (use suggest_task_schedule)
-           - Q1: Next available slot
-           - Q2: Protected time blocks
-           - Q3: Batch with similar tasks
-           - Q4: Never
-        
-        5. Batch process (use batch_process_tasks for multiple)
-        
-        Output format:
-        Task: [name]
-        Quadrant: [Q1/Q2/Q3/Q4]
-        Priority: [score/10]
-        Deadline: [date or none]
-        Dependencies: [list or none]
-        Schedule: [when to do it]
-        Reasoning: [1 line why]
-        
-        Rules:
-        - Protect Q2 time (strategic work)
-        - Don't let Q3 hijack the day
-        - Be ruthless about Q4
-        - If everything is Q1, nothing is
-        """,
-        tools=[
-            categorize_task_eisenhower,
-            calculate_deadline_urgency,
-            check_task_dependencies,
-            suggest_task_schedule,
-            batch_process_tasks
-        ]
+        instruction=load_instruction('task_agent'),
+        tools=list(_TASK_TOOLS)  # ADK expects a list
     )
     
-    return agent
+    return _task_agent
+
+
+def _task_minutes(task: Dict):
+    """estimated_duration in minutes - anything but a positive number ('2h', None) gets the default"""
+    duration = task.get('estimated_duration')
+    if isinstance(duration, (int, float)) and not isinstance(duration, bool) and duration > 0:
+        return duration
+    return DEFAULT_TASK_MINUTES
+
+
+def _dependency_key(tasks: List[Dict]) -> tuple:
+    """
+    Hashable view of the task graph - unchanged while ids, dependencies and durations are
+    
+    Ids are kept as given, so 1 and '1' stay separate tasks; sorting goes
+    by repr so mixed id types still give one stable key.
+    """
+    rows = []
+    for task in tasks:
+        if task.get('id') is None:
+            continue
+        deps = task.get('dependencies') or ()
+        if isinstance(deps, (str, int)):
+            deps = (deps,)  # a lone id rather than a list
+        rows.append((task['id'], tuple(sorted(deps, key=repr)), _task_minutes(task)))
+    return tuple(sorted(rows, key=repr))
+
+
+@lru_cache(maxsize=32)
+def _dependency_order(graph: tuple) -> tuple:
+    """
+    Topological order, transitive blockers and critical path for a task graph
+    
+    Kahn's algorithm for the order, then each task's blockers are a bitset
+    over topological positions, unioned from its direct dependencies in a
+    single pass. Critical path lengths come from one walk back over the
+    order (backflow): a task's own minutes plus the longest chain it holds
+    up. Cached per graph, so the daily re-runs over the same task set skip
+    it entirely.
+    
+    Args:
+        graph: Key from _dependency_key - ((task_id, (dependency_ids, ...), minutes), ...)
+    
+    Returns:
+        (order, waits_on, cyclic, critical_path) - task ids in dependency
+        order, (task_id, all upstream task ids) pairs for tasks that have
+        any, the ids caught in a dependency cycle (left out of the order),
+        and (task_id, critical path minutes) pairs, longest first
+    """
+    # parallel columns indexed by task number, so the passes below index
+    # lists instead of hashing ids (a repeated id keeps its last entry)
+    rows = {task_id: (deps, duration) for task_id, deps, duration in graph}
+    ids = list(rows)
+    index = {task_id: n for n, task_id in enumerate(ids)}
+    minutes = [duration for _, duration in rows.values()]
+    # ignore dependencies on tasks outside this set
+    blockers = [[index[dep] for dep in deps if dep in index] for deps, _ in rows.values()]
+    dependents = [[] for _ in ids]
+    for n, task_blockers in enumerate(blockers):
+        for blocker in task_blockers:
+            dependents[blocker].append(n)
+    
+    pending = [len(task_blockers) for task_blockers in blockers]
+    ready = deque(n for n, count in enumerate(pending) if count == 0)
+    order = []
+    while ready:
+        n = ready.popleft()
+        order.append(n)
+        for dependent in dependents[n]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+    
+    position = [-1] * len(ids)  # -1 = caught in a cycle
+    for i, n in enumerate(order):
+        position[n] = i
+    masks = [0] * len(order)
+    waits_on = []
+    for i, n in enumerate(order):
+        for blocker in blockers[n]:
+            j = position[blocker]
+            if j >= 0:
+                masks[i] |= masks[j] | (1 << j)
+        if masks[i]:
+            waits_on.append((ids[n], tuple(ids[order[j]] for j in range(i) if masks[i] >> j & 1)))
+    
+    cyclic = tuple(ids[n] for n in range(len(ids)) if position[n] < 0)
+    
+    chain = [0] * len(ids)  # tasks stuck in a cycle add nothing
+    for n in reversed(order):
+        chain[n] = minutes[n] + max((chain[dependent] for dependent in dependents[n]), default=0)
+    # stable sort keeps dependency order between equal chains
+    critical_path = tuple(sorted(((ids[n], chain[n]) for n in order), key=lambda item: -item[1]))
+    order = [ids[n] for n in order]
+    return tuple(order), tuple(waits_on), cyclic, critical_path
+
+
+def _dependency_summary(task_list: List[Dict]) -> str:
+    """Precomputed dependency order for the prompt ('' if no task has dependencies)"""
+    if not any(task.get('dependencies') for task in task_list):
+        return ""
+    
+    order, waits_on, cyclic, critical_path = _dependency_order(_dependency_key(task_list))
+    lines = [f"Dependency order (already resolved): {' -> '.join(map(str, order))}\n"]
+    for task_id, blockers in waits_on:
+        lines.append(f"   {task_id} waits on: {', '.join(map(str, blockers))}\n")
+    if cyclic:
+        lines.append(f"   Circular dependencies: {', '.join(map(str, cyclic))}\n")
+    # longest chain of work each task holds up - schedule the top ones first
+    lines.append("Critical path (minutes, longest first): ")
+    lines.append(", ".join(f"{task_id} (cp={cp})" for task_id, cp in critical_path))
+    lines.append("\n")
+    return "".join(lines)
+
+
+def _quick_priority(task: Dict) -> Optional[str]:
+    """
+    Prioritize one task with the local scoring tools, no model call
+    
+    Importance comes from _HINT_WEIGHTS, urgency from the deadline. Only
+    clear-cut tasks (either score 5+) are answered here; the rest return
+    None and go to the agent.
+    """
+    text = f"{task.get('name', '')} {task.get('description', '')}"
+    hints = {match.lower() for match in _HINT_PATTERN.findall(text)}
+    importance = min(10, sum(_HINT_WEIGHTS[hint] for hint in hints))
+    urgency = calculate_deadline_urgency(task['deadline'])['urgency_score'] if task.get('deadline') else 0
+    if importance < 5 and urgency < 5:
+        return None
+    
+    # deadline already folded into urgency, so it isn't passed again
+    result = categorize_task_eisenhower(
+        task.get('name', 'Unnamed'),
+        urgency_score=urgency,
+        importance_score=importance,
+        sender_context=task.get('sender')
+    )
+    return (
+        f"1. {task.get('name', 'Unnamed')} - {result['quadrant']} {result['action']} "
+        f"({result['priority_level']})\n"
+        f"   {result['recommendation']}\n"
+        f"   Why: {result['reasoning']}\n"
+    )
 
 
 def prioritize_tasks(task_list: List[Dict], calendar_context: Optional[Dict] = None) -> Dict:
@@ -104,17 +250,30 @@ def prioritize_tasks(task_list: List[Dict], calendar_context: Optional[Dict] = N
         Prioritized task list with quadrants and schedule
     """
     
+    # a lone task with an obvious answer doesn't need the agent
+    if len(task_list) == 1 and not calendar_context:
+        quick = _quick_priority(task_list[0])
+        if quick:
+            return {
+                "prioritized_tasks": quick,
+                "task_count": 1,
+                "analysis_timestamp": datetime.now().isoformat()
+            }
+    
     agent = create_task_management_agent()
     
-    # format tasks
-    task_summary = f"Prioritize {len(task_list)} tasks:\n\n"
+    # format tasks - collect the lines and join once
+    lines = [f"Prioritize {len(task_list)} tasks:\n\n"]
     for i, task in enumerate(task_list, 1):
-        task_summary += f"{i}. {task.get('name', 'Unnamed')}\n"
+        lines.append(f"{i}. {task.get('name', 'Unnamed')}\n")
         if task.get('deadline'):
-            task_summary += f"   Deadline: {task['deadline']}\n"
+            lines.append(f"   Deadline: {task['deadline']}\n")
         if task.get('description'):
-            task_summary += f"   Details: {task['description']}\n"
-        task_summary += "\n"
+            lines.append(f"   Details: {task['description']}\n")
+        lines.append("\n")
+    # dependency graph worked out here rather than by the model each call
+    lines.append(_dependency_summary(task_list))
+    task_summary = "".join(lines)
     
     query = f"""{task_summary}
     
@@ -152,12 +311,13 @@ def process_email_tasks(email_action_items: List[Dict]) -> Dict:
     agent = create_task_management_agent()
     
     # quick format
-    task_summary = "Tasks from email:\n"
+    lines = ["Tasks from email:\n"]
     for item in email_action_items:
-        task_summary += f"- {item.get('task', 'Unknown')}"
+        lines.append(f"- {item.get('task', 'Unknown')}")
         if item.get('deadline'):
-            task_summary += f" (due: {item['deadline']})"
-        task_summary += "\n"
+            lines.append(f" (due: {item['deadline']})")
+        lines.append("\n")
+    task_summary = "".join(lines)
     
     query = f"""{task_summary}
     
@@ -217,23 +377,17 @@ def analyze_task_load(tasks: List[Dict]) -> Dict:
     Are we in firefighting mode or strategic?
     """
     
-    # quick analysis without agent
-    q1_count = 0
-    q2_count = 0
-    q3_count = 0
-    q4_count = 0
-    
-    # rough categorization
+    # quick analysis without agent - rough categorization by keyword.
+    # counts is indexed by the keyword flags: 0 = Q4, 1 = Q3, 2 = Q2, 3 = Q1
+    counts = [0, 0, 0, 0]
     for task in tasks:
-        desc = str(task).lower()
-        if "urgent" in desc and "important" in desc:
-            q1_count += 1
-        elif "important" in desc and "urgent" not in desc:
-            q2_count += 1
-        elif "urgent" in desc:
-            q3_count += 1
-        else:
-            q4_count += 1
+        flags = 0
+        for match in _LOAD_KEYWORDS.finditer(str(task)):
+            flags |= 1 if match.group().lower() == "urgent" else 2
+            if flags == 3:
+                break
+        counts[flags] += 1
+    q4_count, q3_count, q2_count, q1_count = counts
     
     total = len(tasks)
     
@@ -9,6 +9,18 @@ import os
 from typing import List, Dict
 from pathlib import Path
 
+from .file_cache import load_cached
+
+# Default data/calendar.json relative to project root, resolved once
+_DEFAULT_CALENDAR_JSON = Path(__file__).resolve().parents[2] / "data" / "calendar.json"
+
+try:
+    import orjson as _json
+    _JSONDecodeError = _json.JSONDecodeError
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json = json
+    _JSONDecodeError = json.JSONDecodeError
+
 
 def read_calendar_from_json(json_path: str = None) -> List[Dict]:
     """
@@ -31,25 +43,42 @@ def read_calendar_from_json(json_path: str = None) -> List[Dict]:
         json_path: Path to JSON file. If None, uses default data/calendar.json
         
     Returns:
-        List of calendar event dictionaries
+        List of calendar event dictionaries. Repeated reads of an unchanged
+        file are served from memory.
     """
     if json_path is None:
-        # Default to data/calendar.json relative to project root
-        project_root = Path(__file__).parent.parent.parent
-        json_path = project_root / "data" / "calendar.json"
+        json_path = _DEFAULT_CALENDAR_JSON
     
     # Convert to Path object if string
     if isinstance(json_path, str):
         json_path = Path(json_path)
     
-    if not json_path.exists():
-        raise FileNotFoundError(f"Calendar JSON file not found: {json_path}")
+    # the cache's stat() doubles as the existence check
+    try:
+        records = load_cached(json_path, _parse_calendar_json)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Calendar JSON file not found: {json_path}") from None
     
+    return [_copy_event(event) for event in records]
+
+
+def _copy_event(event: Dict) -> Dict:
+    """Copy a cached event so callers can edit it, attendees list included."""
+    event = dict(event)
+    for key, value in event.items():
+        # one level is enough - event values are scalars or flat lists
+        if type(value) is list:
+            event[key] = value[:]
+    return event
+
+
+def _parse_calendar_json(json_path: Path) -> List[Dict]:
+    """Parse a calendar JSON file into a list of event dictionaries."""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            events = json.load(f)
+        # parse the raw bytes - no text decoding pass before the parser
+        events = _json.loads(json_path.read_bytes())
     
-    except json.JSONDecodeError as e:
+    except _JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in calendar file {json_path}: {str(e)}")
     except Exception as e:
         raise IOError(f"Error reading calendar JSON file {json_path}: {str(e)}")
@@ -6,9 +6,47 @@ Reads email data from CSV files.
 
 import csv
 import os
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional
 from pathlib import Path
 
+from .file_cache import load_cached
+
+# Default data/sample_emails.csv relative to project root, resolved once
+_DEFAULT_EMAIL_CSV = Path(__file__).resolve().parents[2] / "data" / "sample_emails.csv"
+
+# Large read buffer so the CSV is pulled in with a few syscalls, not per-line
+_READ_BUFFER_SIZE = 1 << 20
+
+# Accepted header names for each field, in order of preference
+_EMAIL_COLUMNS = (
+    ('subject', 'Subject'),
+    ('from', 'From', 'sender'),
+    ('body', 'Body', 'content'),
+    ('timestamp', 'Timestamp', 'date'),
+)
+
+
+class Email(NamedTuple):
+    """
+    One parsed email row, kept as a tuple while cached
+    
+    Much smaller than a dict per row for large inboxes; callers still get
+    dicts from read_emails_from_csv via as_dict().
+    """
+    subject: Optional[str]
+    sender: Optional[str]
+    body: Optional[str]
+    timestamp: Optional[str]
+    
+    def as_dict(self) -> Dict:
+        """Email as the dict shape the agents use ('from', not 'sender')"""
+        return {
+            'subject': self.subject,
+            'from': self.sender,
+            'body': self.body,
+            'timestamp': self.timestamp
+        }
+
 
 def read_emails_from_csv(csv_path: str = None) -> List[Dict]:
     """
@@ -24,41 +62,63 @@ def read_emails_from_csv(csv_path: str = None) -> List[Dict]:
         csv_path: Path to CSV file. If None, uses default data/sample_emails.csv
         
     Returns:
-        List of email dictionaries with keys: subject, from, body, timestamp
+        List of email dictionaries with keys: subject, from, body, timestamp.
+        Repeated reads of an unchanged file are served from memory.
     """
     if csv_path is None:
-        # Default to data/sample_emails.csv relative to project root
-        project_root = Path(__file__).parent.parent.parent
-        csv_path = project_root / "data" / "sample_emails.csv"
+        csv_path = _DEFAULT_EMAIL_CSV
     
     # Convert to Path object if string
     if isinstance(csv_path, str):
         csv_path = Path(csv_path)
     
-    if not csv_path.exists():
-        raise FileNotFoundError(f"Email CSV file not found: {csv_path}")
+    # the cache's stat() doubles as the existence check
+    try:
+        records = load_cached(csv_path, _parse_emails_csv)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Email CSV file not found: {csv_path}") from None
     
+    return [email.as_dict() for email in records]
+
+
+def _parse_emails_csv(csv_path: Path) -> List[Email]:
+    """Parse an email CSV file into a list of Email tuples."""
     emails = []
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(csv_path, 'r', encoding='utf-8', newline='', buffering=_READ_BUFFER_SIZE) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return emails
+            
+            # Normalize column names once from the header (handle case variations)
+            columns = {name: i for i, name in enumerate(header)}
+            subject_i, from_i, body_i, timestamp_i = (
+                next((columns[name] for name in names if name in columns), None)
+                for names in _EMAIL_COLUMNS
+            )
+            width = len(header)
             
             for row in reader:
-                # Normalize column names (handle case variations)
-                email = {
-                    'subject': row.get('subject', row.get('Subject', '')),
-                    'from': row.get('from', row.get('From', row.get('sender', ''))),
-                    'body': row.get('body', row.get('Body', row.get('content', ''))),
-                    'timestamp': row.get('timestamp', row.get('Timestamp', row.get('date', '')))
-                }
+                if not row:
+                    continue  # blank line
+                if len(row) < width:
+                    # missing trailing fields read as None, as with DictReader
+                    row += [None] * (width - len(row))
+                
+                email = Email(
+                    subject=row[subject_i] if subject_i is not None else '',
+                    sender=row[from_i] if from_i is not None else '',
+                    body=row[body_i] if body_i is not None else '',
+                    timestamp=row[timestamp_i] if timestamp_i is not None else ''
+                )
                 
                 # Only add if we have at least subject and from
-                if email['subject'] or email['from']:
+                if email.subject or email.sender:
                     emails.append(email)
     
     except Exception as e:
         raise IOError(f"Error reading email CSV file {csv_path}: {str(e)}")
     
     return emails
-
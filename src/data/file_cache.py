@@ -0,0 +1,50 @@
+"""
+File-backed result cache for ProFlow data readers.
+
+Keeps parsed file contents in memory keyed on path, modification time and
+size, so repeated reads of an unchanged file skip parsing entirely.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+# most files kept parsed at once - least recently read are dropped first
+MAX_CACHED_FILES = 16
+
+# path -> ((mtime_ns, size), parsed records), least recently read first
+_cache: "OrderedDict[str, Tuple[Tuple[int, int], List[Dict]]]" = OrderedDict()
+
+
+def load_cached(path: Path, loader: Callable[[Path], List[Dict]]) -> List[Dict]:
+    """
+    Load records from a file, reusing the parsed result if the file is unchanged.
+    
+    Args:
+        path: Path to an existing data file
+        loader: Function that parses the file and returns a list of dicts
+    
+    Returns:
+        The cached list of records. It is shared between calls, so callers
+        copy records before handing them out.
+    """
+    key = str(path.resolve())
+    stat = path.stat()
+    # size too, so a rewrite within the mtime resolution still re-parses
+    version = (stat.st_mtime_ns, stat.st_size)
+    
+    entry = _cache.get(key)
+    if entry is None or entry[0] != version:
+        entry = (version, loader(path))
+        _cache[key] = entry
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    
+    return entry[1]
+
+
+def clear_cache():
+    """Drop all cached file contents."""
+    _cache.clear()
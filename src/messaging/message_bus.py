@@ -106,15 +106,47 @@ class MessageBus:
         """
         Subscribe an agent to receive messages.
         
+        Subscribing is idempotent per agent name: a new callback replaces
+        any existing one, so recreating an agent doesn't leave stale
+        handlers behind that still receive every broadcast.
+        
         Args:
             agent_name: Name of the agent
             callback: Callback function to handle messages
         """
-        if agent_name not in self.subscribers:
-            self.subscribers[agent_name] = []
-        self.subscribers[agent_name].append(callback)
+        self.subscribers[agent_name] = [callback]
         self.logger.info(f"Agent '{agent_name}' subscribed to message bus")
     
+    def unsubscribe(self, agent_name: str, callback: Callable = None):
+        """
+        Stop delivering messages to an agent.
+        
+        Args:
+            agent_name: Name of the agent
+            callback: If given, only unsubscribe when this is still the
+                agent's registered callback (so an old instance can't
+                remove a newer one registered under the same name)
+        """
+        callbacks = self.subscribers.get(agent_name)
+        if callbacks is None:
+            return
+        if callback is not None and callback not in callbacks:
+            return
+        del self.subscribers[agent_name]
+        self.logger.info(f"Agent '{agent_name}' unsubscribed from message bus")
+    
+    def has_subscriber(self, agent_name: str) -> bool:
+        """
+        Check whether an agent is subscribed to receive messages.
+        
+        Args:
+            agent_name: Name of the agent
+        
+        Returns:
+            True if the agent has a registered callback
+        """
+        return agent_name in self.subscribers
+    
     def publish(self, message: AgentMessage):
         """
         Publish message to receiver(s).
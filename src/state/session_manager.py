@@ -6,11 +6,37 @@ Manages session state, caching, and history tracking with JSON file persistence.
 
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import hashlib
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _dump_session(data: Dict) -> bytes:
+    """Encode session data as indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _load_session(raw: bytes) -> Dict:
+    """Decode session file contents (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Cache keys of this form resolve to the stored analysis for the email ID
+EMAIL_ANALYSIS_KEY_PREFIX = "email_analysis_"
+
 
 class SessionManager:
     """
@@ -47,6 +73,14 @@ class SessionManager:
             'cache': {},  # cache_key -> cached_result
             'history': []  # List of all actions with timestamps
         }
+        
+        # Auto-save is held back while > 0 (see deferred_saves)
+        self._deferred_saves = 0
+        self._unsaved_changes = False
+        
+        # Guards session_data and the file - history can be written from a
+        # background thread (see StatefulEmailAgent)
+        self._lock = threading.RLock()
     
     def load_session(self) -> Dict:
         """
@@ -57,8 +91,8 @@ class SessionManager:
         """
         if self.session_file.exists():
             try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    self.session_data = json.load(f)
+                with open(self.session_file, 'rb') as f:
+                    self.session_data = _load_session(f.read())
                 
                 # Ensure all required keys exist
                 if 'processed_emails' not in self.session_data:
@@ -112,12 +146,13 @@ class SessionManager:
             # Ensure directory exists
             self.session_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # Update last_updated timestamp
-            self.session_data['last_updated'] = datetime.now().isoformat()
-            
-            # Write to file with pretty formatting
-            with open(self.session_file, 'w', encoding='utf-8') as f:
-                json.dump(self.session_data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                # Update last_updated timestamp
+                self.session_data['last_updated'] = datetime.now().isoformat()
+                
+                # Write to file with pretty formatting
+                with open(self.session_file, 'wb') as f:
+                    f.write(_dump_session(self.session_data))
             
             return True
         
@@ -125,6 +160,39 @@ class SessionManager:
             print(f"❌ Error saving session: {e}")
             return False
     
+    @contextmanager
+    def deferred_saves(self):
+        """
+        Hold back auto-saves for a batch of updates and write once at the end.
+        
+        Every history entry normally rewrites the whole session file. Inside
+        this block changes only stay in memory; the file is written a single
+        time when the outermost block exits (if anything changed).
+        
+        Example:
+            with manager.deferred_saves():
+                for email in emails:
+                    agent.process_email(email)
+        """
+        with self._lock:
+            self._deferred_saves += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferred_saves -= 1
+                if self._deferred_saves == 0 and self._unsaved_changes:
+                    self._unsaved_changes = False
+                    self.save_session()
+    
+    def _auto_save(self):
+        """Save now, or just note the change if saves are being deferred."""
+        with self._lock:
+            if self._deferred_saves:
+                self._unsaved_changes = True
+            else:
+                self.save_session()
+    
     def add_to_history(self, action: str, details: Dict = None, result: Any = None):
         """
         Track an action in the history log.
@@ -141,14 +209,42 @@ class SessionManager:
             'result': result
         }
         
-        self.session_data['history'].append(history_entry)
+        with self._lock:
+            self.session_data['history'].append(history_entry)
+            
+            # Keep history size manageable (last 1000 entries)
+            if len(self.session_data['history']) > 1000:
+                self.session_data['history'] = self.session_data['history'][-1000:]
+            
+            # Auto-save after adding to history
+            self._auto_save()
+    
+    def add_history_entries(self, entries: List[Tuple[str, str, Dict]]):
+        """
+        Track several actions at once, with a single auto-save.
         
-        # Keep history size manageable (last 1000 entries)
-        if len(self.session_data['history']) > 1000:
-            self.session_data['history'] = self.session_data['history'][-1000:]
+        Args:
+            entries: (timestamp, action, details) tuples, oldest first.
+                Timestamps are ISO strings taken when the action happened.
+        """
+        history_entries = [
+            {
+                'timestamp': timestamp,
+                'action': action,
+                'details': details or {},
+                'result': None
+            }
+            for timestamp, action, details in entries
+        ]
         
-        # Auto-save after adding to history
-        self.save_session()
+        with self._lock:
+            self.session_data['history'].extend(history_entries)
+            
+            # Keep history size manageable (last 1000 entries)
+            if len(self.session_data['history']) > 1000:
+                self.session_data['history'] = self.session_data['history'][-1000:]
+            
+            self._auto_save()
     
     def _add_to_history(self, action: str, details: Dict = None, result: Any = None):
         """Internal method to add to history without auto-save (to avoid recursion)."""
@@ -180,22 +276,33 @@ class SessionManager:
             'metadata': metadata or {}
         }
         
-        self.session_data['cache'][key] = cache_entry
-        self.add_to_history('cache_set', {
-            'key': key,
-            'metadata': metadata
-        })
+        with self._lock:
+            self.session_data['cache'][key] = cache_entry
+            self.add_to_history('cache_set', {
+                'key': key,
+                'metadata': metadata
+            })
     
     def get_cached_result(self, key: str) -> Optional[Any]:
         """
         Retrieve a cached result.
         
+        Email analyses are stored once, under processed_emails. The old
+        'email_analysis_<email_id>' cache keys are answered from there, so
+        code (and session files) that used them keep working.
+        
         Args:
             key: Cache key
         
         Returns:
             Cached value if found, None otherwise
         """
+        if key.startswith(EMAIL_ANALYSIS_KEY_PREFIX) and key not in self.session_data['cache']:
+            analysis = self.get_email_analysis(key[len(EMAIL_ANALYSIS_KEY_PREFIX):])
+            if analysis is not None:
+                self.add_to_history('cache_hit', {'key': key})
+                return analysis
+        
         if key in self.session_data['cache']:
             cache_entry = self.session_data['cache'][key]
             self.add_to_history('cache_hit', {
@@ -207,23 +314,28 @@ class SessionManager:
         self.add_to_history('cache_miss', {'key': key})
         return None
     
-    def mark_email_processed(self, email_id: str, analysis_result: Dict):
+    def mark_email_processed(self, email_id: str, analysis_result: Dict, log_history: bool = True):
         """
         Mark an email as processed and store its analysis result.
         
         Args:
             email_id: Unique identifier for the email
             analysis_result: Analysis result dictionary
+            log_history: Add an 'email_processed' history entry, which saves
+                the session. Pass False to only update memory when the caller
+                logs the entry itself and the save comes with it.
         """
-        self.session_data['processed_emails'][email_id] = {
-            'analysis': analysis_result,
-            'processed_at': datetime.now().isoformat()
-        }
-        
-        self.add_to_history('email_processed', {
-            'email_id': email_id,
-            'subject': analysis_result.get('subject', 'Unknown')
-        })
+        with self._lock:
+            self.session_data['processed_emails'][email_id] = {
+                'analysis': analysis_result,
+                'processed_at': datetime.now().isoformat()
+            }
+            
+            if log_history:
+                self.add_to_history('email_processed', {
+                    'email_id': email_id,
+                    'subject': analysis_result.get('subject', 'Unknown')
+                })
     
     def is_email_processed(self, email_id: str) -> bool:
         """
@@ -301,8 +413,20 @@ class SessionManager:
         """
         # Create hash from email content
         content = f"{email.get('subject', '')}{email.get('from', '')}{email.get('timestamp', '')}"
-        email_hash = hashlib.md5(content.encode('utf-8')).hexdigest()[:12]
-        return f"email_{email_hash}"
+        return _email_id_for_content(content)
+
+
+@lru_cache(maxsize=4096)
+def _email_id_for_content(content: str) -> str:
+    """
+    Hash email identity content into an email ID (memoized).
+    
+    The same emails come through on every run and again on reprocessing,
+    so repeat lookups skip the encode + hash. Stays MD5 so IDs already
+    stored in session files keep matching.
+    """
+    email_hash = hashlib.md5(content.encode('utf-8')).hexdigest()[:12]
+    return f"email_{email_hash}"
 
 
 # Example usage
@@ -0,0 +1,3 @@
+"""
+Agent tools for ProFlow Agent.
+"""
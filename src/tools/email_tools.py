@@ -8,6 +8,25 @@ from datetime import datetime, timedelta
 import re
 
 
+# automated/bulk mail markers - one compiled alternation so a single scan
+# covers all of them
+_BULK_EMAIL_PATTERN = re.compile(
+    r"\b(?:no-?reply|do-?not-?reply|mailer-daemon|newsletter)@"
+    r"|\bunsubscribe\b"
+    r"|view (?:this email )?in (?:your )?browser"
+    r"|manage (?:your )?(?:email )?preferences"
+    r"|this is an automated (?:message|email|notification)",
+    re.IGNORECASE
+)
+# markers sit in the header or near the top; no need to scan long bodies
+BULK_SCAN_CHARS = 512
+
+
+def is_bulk_email(subject, sender, body):
+    """True for obviously automated mail (newsletters, no-reply notifications)"""
+    return _BULK_EMAIL_PATTERN.search(f"{subject}\n{sender}\n{body[:BULK_SCAN_CHARS]}") is not None
+
+
 def classify_email_priority(subject, sender, body, user_rules=None):
     """Classify email priority (0-10 scale)"""
     
@@ -188,6 +207,42 @@ def extract_action_items(subject, body):
     }
 
 
+def analyze_email(subject, sender, body, user_rules=None):
+    """
+    Classify an email and pull out its tasks and meetings in one call
+    
+    For regular mail, same results as calling classify_email_priority,
+    extract_action_items and extract_meeting_requests separately - callers
+    that need all three per email hand over the email once instead of
+    three times. The exception is automated/bulk mail (see is_bulk_email):
+    it skips those scans and comes back as low priority with no tasks or
+    meetings.
+    
+    Returns:
+        Dict with classification, action_items (the extract_action_items
+        result) and meeting_requests (the extract_meeting_requests result)
+    """
+    if is_bulk_email(subject, sender, body):
+        return {
+            "classification": {
+                "priority": "low",
+                "urgency_score": 0,
+                "requires_response": False,
+                "response_time": "when_possible",
+                "reasoning": ["Automated/bulk email"],
+                "category": "fyi"
+            },
+            "action_items": {"has_action_items": False, "action_items": [], "total_items": 0},
+            "meeting_requests": {"meetings_detected": False, "meetings": []}
+        }
+    
+    return {
+        "classification": classify_email_priority(subject, sender, body, user_rules),
+        "action_items": extract_action_items(subject, body),
+        "meeting_requests": extract_meeting_requests(subject, body)
+    }
+
+
 def _extract_deadline_with_date(text):
     """Extract deadline from text"""
     
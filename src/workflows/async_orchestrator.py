@@ -8,18 +8,38 @@ for CPU-bound tasks.
 import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 import sys
 import os
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# only needed when run directly as a script - as part of the workflows
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import email_tools
 from data import read_emails_from_csv
 
 
+async def _gather_or_cancel(*aws):
+    """
+    asyncio.gather, but a failure cancels and awaits the others first
+    
+    The orchestrator's loop outlives each run(), so siblings left pending
+    after an error would resume on the next run and keep writing into the
+    failed call's state.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class AsyncOrchestrator:
     """
     Async orchestrator that processes emails in parallel.
@@ -28,16 +48,42 @@ class AsyncOrchestrator:
     for CPU-bound email processing tasks.
     """
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: Optional[int] = None, expected_emails: Optional[int] = None):
         """
         Initialize async orchestrator.
         
         Args:
-            max_workers: Maximum number of worker threads for CPU-bound tasks
+            max_workers: Maximum number of worker threads for CPU-bound tasks.
+                Defaults to the number of CPUs.
+            expected_emails: Optional batch size hint. The pool is never
+                larger than this, so small batches don't spin up idle threads.
         """
-        self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 4
+        if expected_emails:
+            max_workers = min(max_workers, expected_emails)
+        
+        self.max_workers = max(1, max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
         self.email_tools = email_tools
+        
+        # Persistent event loop so repeated runs don't pay loop setup/teardown
+        self._loop = asyncio.new_event_loop()
+    
+    def run(self, coro):
+        """
+        Run a coroutine to completion on the orchestrator's event loop.
+        
+        Reuses the same loop across calls instead of creating a new one
+        per call like asyncio.run() does.
+        
+        Args:
+            coro: Coroutine to run (e.g. process_emails_parallel(emails))
+        
+        Returns:
+            Result of the coroutine
+        """
+        return self._loop.run_until_complete(coro)
     
     async def analyze_email_async(self, email: Dict, email_index: int) -> Dict:
         """
@@ -53,13 +99,13 @@ class AsyncOrchestrator:
         Returns:
             Analysis result dictionary
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         email_id = email.get('subject', f'Email {email_index}')[:50]
         
         print(f"  [Email {email_index}] 🚀 STARTED processing: {email_id}")
         
         # Run CPU-bound email analysis in thread pool
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         # Create analysis function that will run in thread
         def _analyze_email():
@@ -67,39 +113,27 @@ class AsyncOrchestrator:
             # Simulate some processing time (in real scenario, this is actual analysis)
             time.sleep(0.5)  # Simulate 500ms processing time
             
-            # Perform actual email analysis
-            classification = self.email_tools.classify_email_priority(
+            # Perform actual email analysis (priority, tasks, meetings)
+            analysis = self.email_tools.analyze_email(
                 subject=email.get('subject', ''),
                 sender=email.get('from', ''),
                 body=email.get('body', '')
             )
             
-            # Extract action items
-            action_items_result = self.email_tools.extract_action_items(
-                subject=email.get('subject', ''),
-                body=email.get('body', '')
-            )
-            
-            # Extract meeting requests
-            meeting_requests_result = self.email_tools.extract_meeting_requests(
-                subject=email.get('subject', ''),
-                body=email.get('body', '')
-            )
-            
             return {
                 'email_index': email_index,
                 'subject': email.get('subject', ''),
                 'from': email.get('from', ''),
-                'classification': classification,
-                'action_items': action_items_result.get('action_items', []),
-                'meeting_requests': meeting_requests_result.get('meetings_detected', False),
-                'processing_time': time.time() - start_time
+                'classification': analysis['classification'],
+                'action_items': analysis['action_items'].get('action_items', []),
+                'meeting_requests': analysis['meeting_requests'].get('meetings_detected', False),
+                'processing_time': time.perf_counter() - start_time
             }
         
         # Run in thread pool (non-blocking)
         result = await loop.run_in_executor(self.executor, _analyze_email)
         
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         print(f"  [Email {email_index}] ✅ FINISHED processing: {email_id} (took {elapsed:.2f}s)")
         
         return result
@@ -109,29 +143,44 @@ class AsyncOrchestrator:
         Process multiple emails in parallel using asyncio.
         
         This method ACTUALLY runs emails in parallel, not sequentially.
-        Each email is processed concurrently using asyncio.gather().
+        A fixed set of max_workers consumers pulls emails from a bounded
+        queue, so at most max_workers emails are in flight and memory
+        stays flat for long batches.
         
         Args:
             emails: List of email dictionaries
         
         Returns:
-            List of analysis results
+            List of analysis results (same order as emails)
         """
         print(f"\n🔄 Starting PARALLEL processing of {len(emails)} emails...")
         print(f"   Using {self.max_workers} worker threads\n")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
+        
+        num_workers = max(1, min(self.max_workers, len(emails)))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_workers * 4)
+        results: List[Dict] = [None] * len(emails)
+        
+        async def producer():
+            for index, email in enumerate(emails):
+                await queue.put((index, email))
+            # One stop marker per worker
+            for _ in range(num_workers):
+                await queue.put(None)
         
-        # Create tasks for all emails - they will run in parallel
-        tasks = [
-            self.analyze_email_async(email, index)
-            for index, email in enumerate(emails)
-        ]
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, email = item
+                results[index] = await self.analyze_email_async(email, index)
         
-        # Execute all tasks in parallel using asyncio.gather
-        results = await asyncio.gather(*tasks)
+        # Run producer and workers concurrently - one failed email stops the batch
+        await _gather_or_cancel(producer(), *(worker() for _ in range(num_workers)))
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         
         print(f"\n✅ PARALLEL processing complete!")
         print(f"   Total time: {total_time:.2f}s")
@@ -139,6 +188,32 @@ class AsyncOrchestrator:
         
         return results
     
+    async def daily_brief(self, emails: List[Dict], calendar_events: List[Dict]) -> Dict:
+        """
+        Process emails and analyze the day's schedule concurrently.
+        
+        The calendar analysis waits on Gemini while the emails are worked
+        through in the thread pool, so the brief takes about as long as the
+        slower of the two instead of their sum.
+        
+        Args:
+            emails: List of email dictionaries
+            calendar_events: Today's calendar events
+        
+        Returns:
+            Dictionary with 'emails' (analysis results, same order as
+            emails) and 'schedule' (calendar analysis text)
+        """
+        # Imported here so email-only runs don't load the Gemini agent
+        from agents.calendar_optimization_agent import analyze_daily_schedule_async
+        
+        email_results, schedule = await _gather_or_cancel(
+            self.process_emails_parallel(emails),
+            analyze_daily_schedule_async(calendar_events)
+        )
+        
+        return {'emails': email_results, 'schedule': schedule}
+    
     def process_emails_sequential(self, emails: List[Dict]) -> List[Dict]:
         """
         Process emails sequentially (for comparison).
@@ -151,49 +226,39 @@ class AsyncOrchestrator:
         """
         print(f"\n🔄 Starting SEQUENTIAL processing of {len(emails)} emails...\n")
         
-        start_time = time.time()
-        results = []
+        start_time = time.perf_counter()
+        results: List[Dict] = [None] * len(emails)
         
         for index, email in enumerate(emails):
             email_id = email.get('subject', f'Email {index}')[:50]
             print(f"  [Email {index}] 🚀 STARTED processing: {email_id}")
             
-            email_start = time.time()
+            email_start = time.perf_counter()
             
             # Perform email analysis (synchronous)
-            classification = self.email_tools.classify_email_priority(
+            analysis = self.email_tools.analyze_email(
                 subject=email.get('subject', ''),
                 sender=email.get('from', ''),
                 body=email.get('body', '')
             )
             
-            action_items_result = self.email_tools.extract_action_items(
-                subject=email.get('subject', ''),
-                body=email.get('body', '')
-            )
-            
-            meeting_requests_result = self.email_tools.extract_meeting_requests(
-                subject=email.get('subject', ''),
-                body=email.get('body', '')
-            )
-            
             # Simulate processing time
             time.sleep(0.5)
             
-            elapsed = time.time() - email_start
+            elapsed = time.perf_counter() - email_start
             print(f"  [Email {index}] ✅ FINISHED processing: {email_id} (took {elapsed:.2f}s)")
             
-            results.append({
+            results[index] = {
                 'email_index': index,
                 'subject': email.get('subject', ''),
                 'from': email.get('from', ''),
-                'classification': classification,
-                'action_items': action_items_result.get('action_items', []),
-                'meeting_requests': meeting_requests_result.get('meetings_detected', False),
+                'classification': analysis['classification'],
+                'action_items': analysis['action_items'].get('action_items', []),
+                'meeting_requests': analysis['meeting_requests'].get('meetings_detected', False),
                 'processing_time': elapsed
-            })
+            }
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         
         print(f"\n✅ SEQUENTIAL processing complete!")
         print(f"   Total time: {total_time:.2f}s")
@@ -202,8 +267,10 @@ class AsyncOrchestrator:
         return results
     
     def shutdown(self):
-        """Shutdown the thread pool executor."""
+        """Shutdown the thread pool executor and close the event loop."""
         self.executor.shutdown(wait=True)
+        if not self._loop.is_closed():
+            self._loop.close()
 
 
 # Example usage
@@ -233,7 +300,7 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("TEST 2: PARALLEL PROCESSING")
     print("="*60)
-    parallel_results = asyncio.run(orchestrator.process_emails_parallel(emails))
+    parallel_results = orchestrator.run(orchestrator.process_emails_parallel(emails))
     parallel_time = sum(r['processing_time'] for r in parallel_results)
     
     # Compare results
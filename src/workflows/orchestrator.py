@@ -10,8 +10,10 @@ import sys
 import os
 import time
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# only needed when run directly as a script - as part of the workflows
+# package, src/ is already on the path
+if not __package__:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import email_tools, calendar_tools, meeting_prep_tools, scheduling_tools
 from data import read_emails_from_csv, read_calendar_from_json
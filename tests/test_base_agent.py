@@ -47,6 +47,33 @@ class TestBaseAgent(unittest.TestCase):
         self.assertEqual(received[0].receiver, 'receiver_agent')
         self.assertEqual(received[0].content['test'], 'data')
     
+    def test_send_message_to_unknown_receiver_is_dropped(self):
+        """Test messages to unsubscribed receivers are not published"""
+        history = self.agent.message_bus.message_history
+        history_len = len(history)
+        
+        self.agent.send_message(
+            receiver='nobody_listening',
+            message_type=MessageType.REQUEST,
+            content={'test': 'data'}
+        )
+        
+        self.assertEqual(len(history), history_len)
+    
+    def test_send_message_to_all_is_broadcast(self):
+        """Test send_message to ALL still reaches the other agents"""
+        received = []
+        self.agent.message_bus.subscribe('other_agent', lambda msg: received.append(msg))
+        
+        self.agent.send_message(
+            receiver='ALL',
+            message_type=MessageType.BROADCAST,
+            content={'announcement': 'test'}
+        )
+        
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].receiver, 'ALL')
+    
     def test_broadcast(self):
         """Test broadcasting messages"""
         received = []
@@ -69,6 +96,44 @@ class TestBaseAgent(unittest.TestCase):
         self.assertIn('status', response)
         self.assertIn('agent', response)
         self.assertEqual(response['agent'], 'test_agent')
+    
+    def test_handle_request_replies_to_sender(self):
+        """Test request messages are dispatched and answered"""
+        received = []
+        self.agent.message_bus.subscribe('requester', lambda msg: received.append(msg))
+        
+        self.agent.handle_message(AgentMessage(
+            sender='requester',
+            receiver='test_agent',
+            message_type=MessageType.REQUEST,
+            content={'action': 'ping'}
+        ))
+        
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].message_type, MessageType.RESPONSE)
+        self.assertEqual(received[0].content['agent'], 'test_agent')
+    
+    def test_handle_unknown_type_is_ignored(self):
+        """Test message types without a handler are ignored"""
+        received = []
+        self.agent.message_bus.subscribe('requester', lambda msg: received.append(msg))
+        
+        self.agent.handle_message(AgentMessage(
+            sender='requester',
+            receiver='test_agent',
+            message_type=MessageType.RESPONSE,
+            content={}
+        ))
+        
+        self.assertEqual(received, [])
+    
+    def test_close_unsubscribes(self):
+        """Test close() removes the agent from the message bus"""
+        self.assertIn('test_agent', self.agent.message_bus.subscribers)
+        
+        self.agent.close()
+        
+        self.assertNotIn('test_agent', self.agent.message_bus.subscribers)
 
 
 if __name__ == '__main__':
@@ -81,6 +81,146 @@ class TestFullWorkflow:
         
         assert cached_count2 > 0, "Second run should use cache"
         assert len(results1) == len(results2), "Should process same number of emails"
+    
+    def test_async_processing_matches_sync(self, tmp_path):
+        """Test concurrent processing gives the same results as the sync path."""
+        import asyncio
+        
+        emails = read_emails_from_csv()
+        
+        sync_manager = SessionManager(str(tmp_path / "sync_session.json"))
+        sync_manager.load_session()
+        sync_results = StatefulEmailAgent(sync_manager).process_emails(emails)
+        
+        async_manager = SessionManager(str(tmp_path / "async_session.json"))
+        async_manager.load_session()
+        agent = StatefulEmailAgent(async_manager)
+        async_results = asyncio.run(agent.process_emails_async(emails, max_concurrency=2))
+        
+        assert [r['email_id'] for r in async_results] == [r['email_id'] for r in sync_results], \
+            "Results should keep input order"
+        assert [r['classification'] for r in async_results] == \
+            [r['classification'] for r in sync_results]
+        
+        # Second pass is served entirely from the session cache
+        cached_results = asyncio.run(agent.process_emails_async(emails))
+        assert all(r.get('from_cache') for r in cached_results)
+    
+    def test_async_processing_starts_longest_emails_first(self, tmp_path):
+        """Test uncached emails are analyzed longest bucket first, results in input order."""
+        import asyncio
+        
+        session_manager = SessionManager(str(tmp_path / "bucket_session.json"))
+        session_manager.load_session()
+        agent = StatefulEmailAgent(session_manager)
+        
+        started = []
+        analyze = agent.analyze_email
+        
+        def recording_analyze(subject, sender, body):
+            started.append(subject)
+            return analyze(subject, sender, body)
+        
+        agent.analyze_email = recording_analyze
+        
+        emails = [
+            {'subject': 'short', 'from': 'a@example.com', 'body': 'ok', 'timestamp': ''},
+            {'subject': 'long', 'from': 'b@example.com', 'body': 'x' * 8000, 'timestamp': ''},
+        ]
+        results = asyncio.run(agent.process_emails_async(emails, max_concurrency=1))
+        
+        assert started == ['long', 'short']
+        assert [r['subject'] for r in results] == ['short', 'long']
+        
+        batch = agent.get_processing_history()[-1]
+        assert batch['details']['length_buckets'] == {'<256': 1, '256-1k': 0, '1k-4k': 1, '4k+': 0}
+    
+    def test_duplicate_emails_analyzed_once(self, tmp_path):
+        """Test repeated emails in one batch share a single analysis."""
+        session_manager = SessionManager(str(tmp_path / "dedupe_session.json"))
+        session_manager.load_session()
+        agent = StatefulEmailAgent(session_manager)
+        
+        digest = {'subject': 'Daily digest', 'from': 'noreply@example.com',
+                  'body': 'Status update', 'timestamp': '2024-11-20T08:00:00'}
+        other = {'subject': 'Budget review', 'from': 'cfo@example.com',
+                 'body': 'Please review the budget by Friday.', 'timestamp': '2024-11-20T09:00:00'}
+        results = agent.process_emails([digest, other, dict(digest)])
+        
+        assert len(results) == 3
+        assert not results[0]['from_cache']
+        assert results[2]['from_cache'], "Repeat should reuse the first analysis"
+        assert results[2]['classification'] == results[0]['classification']
+        
+        summary = session_manager.get_history('batch_processing_complete')[-1]['details']
+        assert summary['processed'] == 2
+        assert summary['duplicates'] == 1
+    
+    def test_history_written_in_background(self, tmp_path):
+        """Test queued history entries reach the session file."""
+        import json
+        
+        session_file = tmp_path / "history_session.json"
+        session_manager = SessionManager(str(session_file))
+        session_manager.load_session()
+        agent = StatefulEmailAgent(session_manager)
+        
+        email = {'subject': 'Quick question', 'from': 'a@example.com',
+                 'body': 'Can you send the report?', 'timestamp': '1'}
+        agent.process_email(email)
+        agent.close()
+        
+        actions = [h['action'] for h in json.loads(session_file.read_text(encoding='utf-8'))['history']]
+        assert 'email_processing_start' in actions
+        assert 'email_processing_complete' in actions
+    
+    def test_process_email_leaves_saving_to_writer(self, tmp_path):
+        """Test a fresh email isn't saved on the caller's thread."""
+        import json
+        import threading
+        
+        session_file = tmp_path / "writer_session.json"
+        session_manager = SessionManager(str(session_file))
+        session_manager.load_session()
+        agent = StatefulEmailAgent(session_manager)
+        
+        save_threads = []
+        save = session_manager.save_session
+        
+        def recording_save():
+            save_threads.append(threading.current_thread())
+            return save()
+        
+        session_manager.save_session = recording_save
+        
+        email = {'subject': 'Quick question', 'from': 'a@example.com',
+                 'body': 'Can you send the report?', 'timestamp': '1'}
+        email_id = agent.process_email(email)['email_id']
+        agent.flush_history()
+        
+        assert save_threads, "Writer should have saved the session"
+        assert threading.current_thread() not in save_threads
+        saved = json.loads(session_file.read_text(encoding='utf-8'))
+        assert email_id in saved['processed_emails']
+        assert 'email_processed' in [h['action'] for h in saved['history']]
+        agent.close()
+    
+    def test_hot_cache_is_bounded(self, tmp_path):
+        """Test the in-memory analysis cache keeps only the most recent emails."""
+        session_manager = SessionManager(str(tmp_path / "hot_cache_session.json"))
+        session_manager.load_session()
+        agent = StatefulEmailAgent(session_manager)
+        agent._hot_cap = 2
+        
+        emails = [
+            {'subject': f'Email {i}', 'from': 'a@example.com', 'body': 'Hi', 'timestamp': str(i)}
+            for i in range(3)
+        ]
+        agent.process_emails(emails)
+        
+        assert len(agent._hot_cache) == 2, "Oldest entry should be evicted"
+        # Evicted email is still answered from the session
+        assert agent.process_email(emails[0])['from_cache']
 
 
 class TestPerformance:
@@ -31,6 +31,43 @@ class TestMessageBus(unittest.TestCase):
         self.assertIn('test_agent', self.bus.subscribers)
         self.assertEqual(len(self.bus.subscribers['test_agent']), 1)
     
+    def test_subscribe_same_name_replaces_callback(self):
+        """Test resubscribing an agent name doesn't stack callbacks"""
+        received_old = []
+        received_new = []
+        
+        self.bus.subscribe('test_agent', lambda m: received_old.append(m))
+        self.bus.subscribe('test_agent', lambda m: received_new.append(m))
+        self.assertEqual(len(self.bus.subscribers['test_agent']), 1)
+        
+        self.bus.publish(AgentMessage(
+            sender='sender',
+            receiver='test_agent',
+            message_type=MessageType.REQUEST,
+            content={}
+        ))
+        
+        self.assertEqual(received_old, [])
+        self.assertEqual(len(received_new), 1)
+    
+    def test_unsubscribe(self):
+        """Test unsubscribe only removes the matching callback"""
+        def old_callback(msg):
+            pass
+        
+        def new_callback(msg):
+            pass
+        
+        self.bus.subscribe('test_agent', new_callback)
+        self.bus.unsubscribe('test_agent', old_callback)
+        self.assertIn('test_agent', self.bus.subscribers)
+        
+        self.bus.unsubscribe('test_agent', new_callback)
+        self.assertNotIn('test_agent', self.bus.subscribers)
+        
+        # Unknown agents are ignored
+        self.bus.unsubscribe('missing_agent')
+    
     def test_publish_message(self):
         """Test message publishing"""
         received = []
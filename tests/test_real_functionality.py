@@ -16,11 +16,25 @@ from pathlib import Path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from data import read_emails_from_csv, read_calendar_from_json
+from data.file_cache import clear_cache
 from state.session_manager import SessionManager
 from utils.retry_logic import retry_with_backoff, SchedulingWithRetry
 from workflows.async_orchestrator import AsyncOrchestrator
 import asyncio
 from utils.error_handler import get_error_handler
+from agents.response_cache import ResponseCache, normalize_people
+
+
+def _best_time(read, before=None, runs=5):
+    """Fastest of several timed reads, calling before() ahead of each one."""
+    best = float('inf')
+    for _ in range(runs):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        read()
+        best = min(best, time.perf_counter() - start)
+    return best
 
 
 class TestCSVEmailReader:
@@ -53,6 +67,38 @@ class TestCSVEmailReader:
         emails = read_emails_from_csv(str(test_csv))
         assert len(emails) == 1
         assert emails[0]['subject'] == "Test"
+    
+    def test_read_csv_reuses_parse_until_file_changes(self, tmp_path):
+        """Test unchanged files are served from cache and edits are picked up."""
+        test_csv = tmp_path / "cached_emails.csv"
+        test_csv.write_text(
+            "subject,from,body,timestamp\n"
+            "First,test@example.com,Body,2024-11-20T10:00:00\n"
+        )
+        
+        first = read_emails_from_csv(str(test_csv))
+        first[0]['subject'] = "Mutated"
+        second = read_emails_from_csv(str(test_csv))
+        assert second[0]['subject'] == "First", "Caller edits should not leak into cache"
+        
+        test_csv.write_text(
+            "subject,from,body,timestamp\n"
+            "Second,test@example.com,Body,2024-11-20T10:00:00\n"
+        )
+        stat = test_csv.stat()
+        os.utime(test_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        third = read_emails_from_csv(str(test_csv))
+        assert third[0]['subject'] == "Second", "Modified file should be re-read"
+    
+    def test_cache_hit_cheaper_than_parse(self, tmp_path):
+        """Test a cached read of a large CSV costs less than parsing it."""
+        test_csv = tmp_path / "large_emails.csv"
+        rows = [f"Subject {i},sender{i}@example.com,Body {i},2024-11-20T10:00:00" for i in range(20000)]
+        test_csv.write_text("subject,from,body,timestamp\n" + "\n".join(rows) + "\n")
+        
+        assert _best_time(lambda: read_emails_from_csv(str(test_csv)), clear_cache) > \
+            _best_time(lambda: read_emails_from_csv(str(test_csv)))
 
 
 class TestJSONCalendarReader:
@@ -91,6 +137,30 @@ class TestJSONCalendarReader:
         events = read_calendar_from_json(str(test_json))
         assert len(events) == 1
         assert events[0]['summary'] == "Test Event"
+    
+    def test_read_json_nested_values_not_shared(self, tmp_path):
+        """Test changing a returned attendees list doesn't leak into later reads."""
+        test_json = tmp_path / "test_calendar.json"
+        test_json.write_text(json.dumps([{"summary": "Sync", "attendees": ["Sarah"]}]))
+        
+        read_calendar_from_json(str(test_json))[0]['attendees'].append("Mike")
+        
+        assert read_calendar_from_json(str(test_json))[0]['attendees'] == ["Sarah"]
+    
+    def test_cache_hit_cheaper_than_parse(self, tmp_path):
+        """Test a cached read of a large JSON file costs less than parsing it."""
+        test_json = tmp_path / "large_calendar.json"
+        test_json.write_text(json.dumps([{
+            "summary": f"Meeting {i}",
+            "start": "2024-11-20T09:00:00",
+            "end": "2024-11-20T10:00:00",
+            "duration_minutes": 60,
+            "type": "meeting",
+            "attendees": ["sarah@example.com", "Mike", f"guest{i}@example.com"]
+        } for i in range(5000)]))
+        
+        assert _best_time(lambda: read_calendar_from_json(str(test_json)), clear_cache) > \
+            _best_time(lambda: read_calendar_from_json(str(test_json)))
 
 
 class TestSessionPersistence:
@@ -133,6 +203,136 @@ class TestSessionPersistence:
         
         assert len(history) > 0, "History should have entries"
         assert history[-1]['action'] == "test_action", "Last action should match"
+    
+    def test_email_analysis_cache_key_resolves(self, tmp_path):
+        """Test the email_analysis_<id> cache key reads the processed email."""
+        manager = SessionManager(str(tmp_path / "test_session.json"))
+        manager.load_session()
+        manager.mark_email_processed("email_abc", {"subject": "Test"})
+        
+        assert manager.get_cached_result("email_analysis_email_abc") == {"subject": "Test"}
+        assert "email_analysis_email_abc" not in manager.session_data['cache'], \
+            "Analysis should be stored only once"
+    
+    def test_deferred_saves_write_once(self, tmp_path):
+        """Test batched updates reach the file only when the block exits."""
+        session_file = tmp_path / "test_session.json"
+        manager = SessionManager(str(session_file))
+        manager.load_session()
+        
+        with manager.deferred_saves():
+            manager.add_to_history("batched_action", {"n": 1})
+            manager.cache_result("batched_key", {"value": 1})
+            on_disk = json.loads(session_file.read_text(encoding='utf-8'))
+            assert "batched_key" not in on_disk['cache'], "Should not save inside the block"
+        
+        on_disk = json.loads(session_file.read_text(encoding='utf-8'))
+        assert "batched_key" in on_disk['cache'], "Should save when the block exits"
+        assert on_disk['history'][-1]['action'] == "cache_set"
+
+
+class TestResponseCache:
+    """Test reuse of model answers."""
+    
+    def test_normalized_attendees_share_entry(self):
+        """Test attendee order and case don't change the key."""
+        cache = ResponseCache()
+        cache.put(('briefing', normalize_people(["Sarah Chen", "mike"])), "Briefing")
+        
+        assert cache.get(('briefing', normalize_people(["Mike", "sarah  chen"]))) == "Briefing"
+        assert cache.get(('briefing', normalize_people(["Mike"]))) is None
+    
+    def test_entries_expire_and_evict(self):
+        """Test TTL expiry and the size cap."""
+        cache = ResponseCache(ttl_seconds=0.05, max_entries=2)
+        cache.put(('a',), "A")
+        cache.put(('b',), "B")
+        cache.put(('c',), "C")
+        assert cache.get(('a',)) is None, "Oldest entry should be evicted"
+        assert cache.get(('c',)) == "C"
+        
+        time.sleep(0.1)
+        assert cache.get(('c',)) is None, "Expired entry should not be returned"
+
+
+class TestMeetingReadiness:
+    """Test readiness scoring runs on the local tools alone."""
+    
+    def test_readiness_without_gemini(self):
+        """Test readiness can be scored without loading the Gemini SDK."""
+        from agents.meeting_prep_agent import analyze_meeting_readiness
+        
+        readiness = analyze_meeting_readiness({
+            'subject': 'Client Review',
+            'date': '2025-11-22',
+            'attendees': ['Sarah Chen', 'Mike Rodriguez'],
+            'description': 'Quarterly review'
+        })
+        
+        assert 0 <= readiness['readiness_score'] <= 100
+        assert readiness['readiness_level'] in ("INSUFFICIENT", "LOW", "FAIR", "GOOD", "EXCELLENT")
+        assert readiness['contributing_factors'], "Should explain the score"
+
+
+class TestTaskDependencies:
+    """Test the dependency order worked out before prompting."""
+    
+    def test_dependency_order_and_blockers(self):
+        """Test blockers come first and transitive blockers are listed."""
+        from agents.task_management_agent import _dependency_key, _dependency_order
+        
+        tasks = [
+            {'id': 'deploy', 'dependencies': ['qa'], 'estimated_duration': 15},
+            {'id': 'qa', 'dependencies': ['build'], 'estimated_duration': 60},
+            {'id': 'build'},
+            {'id': 'notes'},
+            {'id': 'a', 'dependencies': ['b']},
+            {'id': 'b', 'dependencies': ['a']},
+        ]
+        order, waits_on, cyclic, critical_path = _dependency_order(_dependency_key(tasks))
+        
+        assert order == ('build', 'notes', 'qa', 'deploy')
+        assert dict(waits_on)['deploy'] == ('build', 'qa')
+        assert set(cyclic) == {'a', 'b'}
+        assert critical_path[0] == ('build', 105), "build holds up qa and deploy"
+        assert dict(critical_path)['notes'] == 30
+    
+    def test_free_form_durations_and_ids(self):
+        """Test non-numeric durations fall back and 1 / '1' stay separate."""
+        from agents.task_management_agent import (
+            _dependency_key, _dependency_order, _dependency_summary, DEFAULT_TASK_MINUTES
+        )
+        
+        tasks = [
+            {'id': 1, 'estimated_duration': '2h'},
+            {'id': '1', 'dependencies': [1], 'estimated_duration': None},
+        ]
+        order, _, _, critical_path = _dependency_order(_dependency_key(tasks))
+        
+        assert order == (1, '1')
+        assert dict(critical_path)[1] == 2 * DEFAULT_TASK_MINUTES
+        assert "1 waits on: 1" in _dependency_summary(tasks)
+    
+    def test_single_clear_task_skips_agent(self):
+        """Test an obvious single task is prioritized without loading the SDK."""
+        from agents.task_management_agent import prioritize_tasks
+        
+        result = prioritize_tasks([{
+            'name': 'Finish budget deck',
+            'deadline': 'today',
+            'description': 'Board meeting tomorrow'
+        }])
+        
+        assert result['task_count'] == 1
+        assert 'Q1' in result['prioritized_tasks']
+    
+    def test_hints_match_whole_words_only(self):
+        """Test words that merely start with a hint are left to the agent."""
+        from agents.task_management_agent import _quick_priority
+        
+        for name in ('Print boarding pass', 'Read legally', 'Survey clientele'):
+            assert _quick_priority({'name': name, 'deadline': 'next month'}) is None, name
+        assert _quick_priority({'name': 'Prep board slides', 'deadline': 'next month'}) is not None
 
 
 class TestRetryLogic:
@@ -233,6 +433,50 @@ class TestAsyncProcessing:
             assert 'email_index' in result
             assert 'subject' in result
 
+    def test_run_reuses_event_loop(self):
+        """Test run() keeps one event loop across calls."""
+        emails = read_emails_from_csv()[:2]
+        
+        orchestrator = AsyncOrchestrator(max_workers=2)
+        loop = orchestrator._loop
+        first = orchestrator.run(orchestrator.process_emails_parallel(emails))
+        second = orchestrator.run(orchestrator.process_emails_parallel(emails))
+        
+        assert orchestrator._loop is loop, "Should reuse the same loop"
+        assert len(first) == len(second) == len(emails)
+        
+        orchestrator.shutdown()
+        assert loop.is_closed(), "Shutdown should close the loop"
+
+    def test_failed_batch_leaves_no_pending_tasks(self):
+        """Test a failing email cancels the rest of the batch on the shared loop."""
+        emails = read_emails_from_csv() * 4
+        
+        orchestrator = AsyncOrchestrator(max_workers=2)
+        
+        async def fail(email, index):
+            raise ValueError("boom")
+        
+        orchestrator.analyze_email_async = fail
+        with pytest.raises(ValueError):
+            orchestrator.run(orchestrator.process_emails_parallel(emails))
+        
+        assert not asyncio.all_tasks(orchestrator._loop), "No tasks should be left on the loop"
+        orchestrator.shutdown()
+    
+    def test_workers_bounded_by_batch_size(self):
+        """Test worker pool is clamped to the expected batch size."""
+        emails = read_emails_from_csv()[:2]
+        
+        orchestrator = AsyncOrchestrator(max_workers=8, expected_emails=len(emails))
+        assert orchestrator.max_workers == len(emails)
+        
+        results = orchestrator.run(orchestrator.process_emails_parallel(emails))
+        orchestrator.shutdown()
+        
+        assert [r['email_index'] for r in results] == list(range(len(emails))), \
+            "Results should keep input order"
+
 
 class TestErrorRecovery:
     """Test system recovers from errors."""